@@ -0,0 +1,174 @@
+import argparse
+import json
+import sys
+from itertools import islice
+
+from ai.cache import ResultCache
+from ai.kuba_ai import KubaAI, load_weights
+from game.kuba_game import KubaGame, decode_move, encode_move, format_move, parse_move
+
+# Archives are JSON lines, one game per line:
+#   {"id": "game-1", "moves": ["00R", "06L", ...], "start": "<notation, optional>"}
+# Annotations are written the same way, one line per game, as soon as the game is done.
+
+DEFAULT_DEPTH = 2
+BLUNDER_THRESHOLD = 10
+
+
+def read_games(path):
+    # games are streamed, the archive is never loaded as a whole
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            # a broken line is reported as that game's error instead of stopping the run
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {"id": number, "error": f"Invalid JSON on line {number}: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"id": number, "error": f"Line {number} is not a JSON object"}
+                continue
+            record.setdefault("id", number)
+            yield record
+
+
+_worker_ai = None
+
+
+def _init_worker(depth, weights=None):
+    global _worker_ai
+    _worker_ai = KubaAI(epsilon=0, look_ahead_depth=depth, weights=weights)
+
+
+def _analyze_position(packed):
+    # runs in the workers, returns (move id, score) pairs from best to worst
+    game = KubaGame.from_packed(packed)
+    analysis = _worker_ai.analyze(game, _worker_ai.look_ahead_depth, top_k=len(game.get_valid_move_ids()))
+    return packed, [(encode_move(*move.move), move.score) for move in analysis.moves]
+
+
+def replay(record):
+    # (packed position, played move id) for every ply, and the error that stopped the replay if any
+    if not isinstance(record, dict):
+        return [], "Record is not a JSON object"
+    if record.get("error"):
+        return [], record["error"]
+    moves = record.get("moves")
+    if not isinstance(moves, list):
+        return [], "Record has no list of moves"
+    try:
+        game = KubaGame.from_notation(record["start"]) if record.get("start") else KubaGame()
+    except (ValueError, AttributeError) as e:
+        return [], f"Invalid start position: {e}"
+
+    plies = []
+    for text in moves:
+        try:
+            coordinates, direction = parse_move(text)
+        except (ValueError, TypeError):
+            return plies, f"Invalid move {text!r} at ply {len(plies) + 1}"
+        packed = game.pack()
+        if not game.make_move(coordinates, direction):
+            return plies, f"Illegal move {text} at ply {len(plies) + 1}: {game.alert.message}"
+        plies.append((packed, encode_move(coordinates, direction)))
+    return plies, None
+
+
+def annotate_game(record, plies, error, results, threshold=BLUNDER_THRESHOLD):
+    annotations = []
+    for ply, (packed, played) in enumerate(plies, 1):
+        scores = results[packed]
+        best, best_score = scores[0]
+        played_score = dict(scores)[played]
+        loss = best_score - played_score
+        annotations.append({
+            "ply": ply,
+            "move": format_move(*decode_move(played)),
+            "score": played_score,
+            "best": format_move(*decode_move(best)),
+            "best_score": best_score,
+            "loss": loss,
+            "blunder": loss >= threshold,
+        })
+    annotated = {"id": record.get("id") if isinstance(record, dict) else None, "annotations": annotations}
+    if error:
+        annotated["error"] = error
+    return annotated
+
+
+def annotate(games, output, depth=DEFAULT_DEPTH, workers=None, chunk_games=64,
+             cache_size=100_000, threshold=BLUNDER_THRESHOLD, weights=None):
+    # games are handled in chunks: replay the chunk, analyze the positions that are neither cached
+    # nor repeated within the chunk on the worker pool, then write the chunk's annotations
+    cache = ResultCache(cache_size)
+    stats = {"games": 0, "positions": 0, "analyzed": 0}
+
+    pool = None
+    if workers != 1:
+        import multiprocessing as mp
+        pool = mp.Pool(workers, _init_worker, (depth, weights))
+    else:
+        _init_worker(depth, weights)
+
+    try:
+        games = iter(games)
+        while True:
+            chunk = list(islice(games, chunk_games))
+            if not chunk:
+                break
+
+            replays = [replay(record) for record in chunk]
+            results = {}
+            pending = []
+            for plies, _ in replays:
+                for packed, _ in plies:
+                    stats["positions"] += 1
+                    if packed in results:
+                        continue
+                    cached = cache.get(packed)
+                    results[packed] = cached
+                    if cached is None:
+                        pending.append(packed)
+
+            analyzed = pool.imap_unordered(_analyze_position, pending, chunksize=8) if pool else map(_analyze_position, pending)
+            for packed, scores in analyzed:
+                results[packed] = scores
+                cache.put(packed, scores)
+            stats["analyzed"] += len(pending)
+
+            for record, (plies, error) in zip(chunk, replays):
+                output.write(json.dumps(annotate_game(record, plies, error, results, threshold)) + "\n")
+                stats["games"] += 1
+            output.flush()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Annotate recorded Kuba games with blunders and best alternatives")
+    parser.add_argument("archive", help="JSON lines file with one game per line")
+    parser.add_argument("--output", help="JSON lines file for the annotations (default: stdout)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU, 1 runs inline)")
+    parser.add_argument("--chunk-games", type=int, default=64, help="games replayed and written per batch")
+    parser.add_argument("--cache-size", type=int, default=100_000, help="analyzed positions kept for reuse")
+    parser.add_argument("--threshold", type=float, default=BLUNDER_THRESHOLD, help="score loss that counts as a blunder")
+    parser.add_argument("--weights", help="JSON file of evaluation weights (default: the built-in weights)")
+    args = parser.parse_args()
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        stats = annotate(read_games(args.archive), output, args.depth, args.workers,
+                         args.chunk_games, args.cache_size, args.threshold,
+                         load_weights(args.weights) if args.weights else None)
+    finally:
+        if args.output:
+            output.close()
+    print(f"{stats['games']} games, {stats['positions']} positions, {stats['analyzed']} analyzed", file=sys.stderr)
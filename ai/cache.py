@@ -0,0 +1,24 @@
+from collections import OrderedDict
+
+
+class ResultCache:
+    # least recently used results, e.g. analyses by packed position, bounded so memory stays flat
+    # however many positions go through it
+    def __init__(self, max_size=100_000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+
+    def get(self, packed):
+        result = self.entries.get(packed)
+        if result is not None:
+            self.entries.move_to_end(packed)
+        return result
+
+    def put(self, packed, result):
+        self.entries[packed] = result
+        self.entries.move_to_end(packed)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
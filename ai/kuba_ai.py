@@ -1,68 +1,194 @@
-import queue
+import json
+import os
 import random
+import time
 from collections import defaultdict
-import pickle
-import multiprocessing as mp
-from tqdm import tqdm
+from itertools import chain
 
-from game.kuba_game import KubaGame
+from game.kuba_game import KubaGame, Marble, decode_move
+
+# evaluate_state is the dot product of these weights with evaluation_features(), all from the
+# point of view of one player, the player to move unless told otherwise
+EVALUATION_FEATURES = ("captured", "removed", "material", "corner", "edge", "center", "victory")
+DEFAULT_WEIGHTS = {
+    "captured": 10,  # captured red marbles, ours minus theirs
+    "removed": 5,  # opponent marbles pushed off
+    "material": 2,  # our marbles minus theirs
+    "corner": 3,  # our marbles in the corners
+    "edge": 2,  # our marbles on the other edge cells
+    "center": 1,  # our marbles in the 3x3 center
+    "victory": 5,  # how much closer we are to winning than the opponent
+}
+WEIGHTS_FILE = "./ai/models/weights.json"
+# the score of a won game, above anything evaluate_state can reach
+WIN_SCORE = 10_000
+# deepest search searched_depth() looks for
+MAX_SEARCH_DEPTH = 32
+
+_CORNERS = [(0, 0), (0, 6), (6, 0), (6, 6)]
+_EDGES = [(i, j) for i in range(7) for j in range(7)
+          if (i in (0, 6) or j in (0, 6)) and (i, j) not in _CORNERS]
+_CENTER = [(i, j) for i in range(2, 5) for j in range(2, 5)]
+
+
+def _zone_count(grid, marble, cells):
+    return sum(grid[i][j] is marble for i, j in cells)
+
+
+def _distance_to_victory(game, player, opponent):
+    # moves left to win at best, by capturing seven reds or by pushing off every opponent marble
+    return min(7 - player.captured_red, game.board.counts[opponent.color])
+
+
+def evaluation_features(game: KubaGame, player=None):
+    # player is matched by color, so a player of the game before a clone still finds its own
+    # captures in the clone
+    color = (player or game.current_player).color
+    if color is game.players[0].color:
+        player, opponent = game.players
+    elif color is game.players[1].color:
+        opponent, player = game.players
+    else:
+        raise ValueError(f"{color.name} is not a player of this game")
+    counts = game.board.counts
+    grid = game.board.grid
+    marble = Marble(player.color)
+    return (
+        player.captured_red - opponent.captured_red,
+        8 - counts[opponent.color],
+        counts[player.color] - counts[opponent.color],
+        _zone_count(grid, marble, _CORNERS),
+        _zone_count(grid, marble, _EDGES),
+        _zone_count(grid, marble, _CENTER),
+        _distance_to_victory(game, opponent, player) - _distance_to_victory(game, player, opponent),
+    )
+
+
+def load_weights(filename):
+    # a JSON object of feature weights, features it leaves out keep their default weight
+    with open(filename) as f:
+        loaded = json.load(f)
+    if not isinstance(loaded, dict):
+        raise ValueError(f"{filename}: expected an object of feature weights")
+    weights = dict(DEFAULT_WEIGHTS)
+    for name, value in loaded.items():
+        if name not in DEFAULT_WEIGHTS:
+            raise ValueError(f"{filename}: unknown feature {name!r}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{filename}: weight of {name!r} is not a number")
+        weights[name] = value
+    return weights
+
+
+def save_weights(weights, filename):
+    with open(filename, 'w') as f:
+        json.dump({name: weights[name] for name in EVALUATION_FEATURES}, f, indent=2)
+        f.write("\n")
+
+class MoveAnalysis:
+    def __init__(self, move, score, pv):
+        self.move = move
+        self.score = score
+        # principal variation, starting with move itself
+        self.pv = pv
+
+    def __repr__(self):
+        return f"{self.move[0]} {self.move[1].name}: {self.score} ({len(self.pv)} moves)"
+
+class Analysis:
+    def __init__(self, moves, depth, nodes, elapsed):
+        # root moves sorted from best to worst
+        self.moves = moves
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def best_move(self):
+        return self.moves[0].move if self.moves else None
+
+    def __repr__(self):
+        return f"Analysis(depth={self.depth}, nodes={self.nodes}, moves={self.moves})"
 
 class KubaAI:
-    def __init__(self, epsilon=0.1, alpha=0.1, gamma=0.9, look_ahead_depth=2):
+    def __init__(self, epsilon=0.1, alpha=0.1, gamma=0.9, look_ahead_depth=2, max_transpositions=200_000,
+                 weights=None, quiescence_depth=4):
         self.q_table = defaultdict(self.default_dict_factory)
         self.epsilon = epsilon
         self.alpha = alpha
         self.gamma = gamma
         self.look_ahead_depth = look_ahead_depth
+        self.nodes = 0
+        # exact negamax scores and best moves by (packed position, depth), kept between analyze() calls
+        self.transpositions = {}
+        self.max_transpositions = max_transpositions
+        self.quiescence_depth = quiescence_depth
+        self.set_weights(weights or DEFAULT_WEIGHTS)
+
+    def set_weights(self, weights):
+        self.weights = dict(weights)
+        self._weight_vector = tuple(self.weights[name] for name in EVALUATION_FEATURES)
+        # cached scores were computed with the old weights
+        self.transpositions.clear()
+
+    @property
+    def quiescence_depth(self):
+        # plies of captures searched past the depth limit, 0 scores the leaves as they are
+        return self._quiescence_depth
+
+    @quiescence_depth.setter
+    def quiescence_depth(self, depth):
+        self._quiescence_depth = depth
+        # cached scores were searched to the old depth
+        self.transpositions.clear()
+
+    def load_weights(self, filename):
+        self.set_weights(load_weights(filename))
 
     @staticmethod
     def default_dict_factory():
         return defaultdict(float)
 
     def get_state_key(self, game: KubaGame):
+        # the KO state is left out, pack() keys positions where it matters. The Q-table is keyed
+        # by board and side to move only, as the shipped model was trained with
         board_state = tuple(tuple(row) for row in game.board.grid)
         return (board_state, game.current_player.color.value)
 
-    def evaluate_state(self, game: KubaGame):
-        current_player = game.current_player
-        opponent = game.opponent
-        
-        # Count marbles
-        marble_counts = game.get_game_state()
-        
-        # Evaluate position
-        score = 0
-        score += 10 * (current_player.captured_red - opponent.captured_red)  # Captured red marbles
-        score += 5 * (8 - marble_counts[opponent.color.value])  # Removed opponent marbles
-        score += 2 * (marble_counts[current_player.color.value] - marble_counts[opponent.color.value])  # Marble advantage
-        score += self.evaluate_control(game, current_player.color.value)  # Board control
-        # score += self.evaluate_potential_moves(game, current_player)
-        score += self.evaluate_distance_to_victory(game, current_player)
-        
+    def evaluate_state(self, game: KubaGame, player=None):
+        return sum(w * f for w, f in zip(self._weight_vector, evaluation_features(game, player)))
+
+    def evaluate_leaf(self, game: KubaGame):
+        # the score for the player to move, always minus the score the opponent would get, so a
+        # position scores the same whichever side the search reached it from.
+        # a game is won by the player who moved last
+        if game.winner:
+            return -WIN_SCORE
+        return self.evaluate_state(game, game.current_player) - self.evaluate_state(game, game.opponent)
+
+    def quiesce(self, game, depth, alpha=float('-inf'), beta=float('inf')):
+        # follows only pushes that take a marble off the board until the position is quiet, so
+        # a leaf is not scored in the middle of an exchange. The side to move may also decline
+        # them (stand pat), and alpha-beta keeps the result exact while pruning inside the window.
+        # negamax, the score is for the player to move
+        self.nodes += 1
+        score = self.evaluate_leaf(game)
+        if depth == 0 or game.winner or score >= beta:
+            return score
+        alpha = max(alpha, score)
+
+        for move in game.get_capture_move_ids():
+            new_game = game.clone()
+            new_game.make_move_id(move)
+            value = -self.quiesce(new_game, depth - 1, -beta, -alpha)
+            score = max(score, value)
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
         return score
-    
+
     # def evaluate_potential_moves(self, game, player):
     #     return len(game.get_valid_moves()) * 0.5
-    
-    def evaluate_distance_to_victory(self, game, player):
-        marbles_to_win = 7 - player.captured_red
-        return (8 - marbles_to_win) * 5 
-
-    def evaluate_control(self, game: KubaGame, color):
-        control_score = 0
-        for i in range(7):
-            for j in range(7):
-                marble = game.board.get_marble((i, j))
-                if not marble:
-                    continue
-                if marble.color.value == color:
-                    if (i == 0 or i == 6) and (j == 0 or j == 6):  # Corners
-                        control_score += 3
-                    elif i == 0 or i == 6 or j == 0 or j == 6:  # Edges
-                        control_score += 2
-                    elif 2 <= i <= 4 and 2 <= j <= 4:  # Center
-                        control_score += 1
-        return control_score
 
     def get_action(self, game):
         if random.random() < self.epsilon:
@@ -84,7 +210,9 @@ class KubaAI:
 
     def minimax(self, game, depth, maximizing_player):
         if depth == 0 or game.winner:
-            return self.evaluate_state(game)
+            score = self.quiesce(game, self.quiescence_depth)
+            return score if maximizing_player else -score
+        self.nodes += 1
         
         if maximizing_player:
             max_eval = float('-inf')
@@ -103,6 +231,87 @@ class KubaAI:
                 min_eval = min(min_eval, eval)
             return min_eval
 
+    def analyze(self, game, max_depth=None, top_k=3, time_limit=None):
+        # iterative deepening over the root moves, the transposition table makes every depth
+        # and every later call on a position from the same game start from earlier work.
+        # without max_depth a call searches one ply deeper than this position was searched
+        # before, and at least look_ahead_depth, so analysis keeps deepening while it is repeated
+        if max_depth is None:
+            max_depth = max(self.look_ahead_depth, self.searched_depth(game) + 1)
+        start = time.perf_counter()
+        nodes = self.nodes
+        packed = game.pack()
+        root_moves = [] if game.winner else game.get_valid_move_ids()
+
+        scores = []
+        depth_reached = 0
+        for depth in range(1, max_depth + 1):
+            scores = []
+            for move in root_moves:
+                new_game = game.clone()
+                new_game.make_move_id(move)
+                scores.append((-self.search(new_game, depth - 1), move))
+            depth_reached = depth
+            if scores:
+                # stored like any searched position, for searched_depth() and later searches
+                self._store((packed, depth), *max(scores, key=lambda item: item[0]))
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+
+        # sorted() is stable, ties keep the move order get_best_move would pick from
+        scores = sorted(scores, key=lambda item: item[0], reverse=True)[:top_k]
+        moves = [MoveAnalysis(decode_move(move), score, self.principal_variation(game, move, depth_reached))
+                 for score, move in scores]
+        return Analysis(moves, depth_reached, self.nodes - nodes, time.perf_counter() - start)
+
+    def search(self, game, depth):
+        # minimax() with a transposition table as negamax, the score is for the player to move:
+        # minimax(game, depth, True) from their side and -minimax(game, depth, False) from the other
+        key = (game.pack(), depth)
+        entry = self.transpositions.get(key)
+        if entry is not None:
+            return entry[0]
+
+        best_move = None
+        if depth == 0 or game.winner:
+            score = self.quiesce(game, self.quiescence_depth)
+        else:
+            self.nodes += 1
+            score = float('-inf')
+            for move in game.get_valid_move_ids():
+                new_game = game.clone()
+                new_game.make_move_id(move)
+                value = -self.search(new_game, depth - 1)
+                if value > score:
+                    score = value
+                    best_move = move
+
+        self._store(key, score, best_move)
+        return score
+
+    def _store(self, key, score, best_move):
+        if len(self.transpositions) >= self.max_transpositions:
+            self.transpositions.clear()
+        self.transpositions[key] = (score, best_move)
+
+    def searched_depth(self, game):
+        # the deepest search of this position still in the transposition table, 0 if there is none
+        packed = game.pack()
+        return max((depth for depth in range(1, MAX_SEARCH_DEPTH + 1) if (packed, depth) in self.transpositions),
+                   default=0)
+
+    def principal_variation(self, game, move, depth):
+        pv = [decode_move(move)]
+        game = game.clone()
+        game.make_move_id(move)
+        for remaining in range(depth - 1, 0, -1):
+            entry = self.transpositions.get((game.pack(), remaining))
+            if entry is None or entry[1] is None:
+                break
+            pv.append(decode_move(entry[1]))
+            game.make_move_id(entry[1])
+        return pv
+
     def update_q_value(self, state, action, next_state, reward, done):
         current_q = self.q_table[state][tuple(action)]
         if not self.q_table[next_state]:
@@ -113,13 +322,44 @@ class KubaAI:
         self.q_table[state][tuple(action)] = new_q
 
     def save_model(self, filename):
+        import pickle
         with open(filename, 'wb') as f:
             pickle.dump(dict(self.q_table), f)
 
     def load_model(self, filename):
         with open(filename, 'rb') as f:
-            loaded_dict = pickle.load(f)
-            self.q_table = defaultdict(self.default_dict_factory, loaded_dict)
+            loaded_dict = _model_unpickler(f).load()
+
+        # swap the pickled marbles for the shared ones, so the keys equal get_state_key() again
+        rows = {row for state in loaded_dict for row in state[0]}
+        shared = {marble: marble and Marble(marble.color) for marble in set(chain.from_iterable(rows))}
+        rows = {row: tuple(map(shared.__getitem__, row)) for row in rows}
+        self.q_table = q_table = defaultdict(self.default_dict_factory)
+        for state, actions in loaded_dict.items():
+            state = (tuple(map(rows.__getitem__, state[0])),) + state[1:]
+            # pickled states that only differed in their marble objects are one state now
+            merged = q_table.setdefault(state, actions)
+            if merged is not actions:
+                merged.update(actions)
+
+class _PickledMarble:
+    # stands in for the marbles of a pickled model until load_model() swaps in the shared ones.
+    # models pickled before marbles were shared create them without a color and set it afterwards
+    def __init__(self, color=None):
+        self.color = color
+
+
+def _model_unpickler(f):
+    import pickle
+
+    class ModelUnpickler(pickle.Unpickler):
+        def find_class(self, module, name):
+            if name == 'Marble' and module in ('game.kuba_game', 'kuba_game'):
+                return _PickledMarble
+            return super().find_class(module, name)
+
+    return ModelUnpickler(f)
+
 
 def train_ai(num_episodes=10000):
     ai = KubaAI()
@@ -147,6 +387,7 @@ def train_ai(num_episodes=10000):
 
     return ai
 
+# the parallel trainer needs `import queue`, `import multiprocessing as mp` and `from tqdm import tqdm`
 # def train_ai_worker(num_episodes, shared_q, worker_id):
 #     ai = KubaAI()
 #     for _ in range(num_episodes):
@@ -178,64 +419,67 @@ def train_ai(num_episodes=10000):
 #     shared_q.put(('q_table', ai.q_table))  # Send the final Q-table
 
 # def train_ai_parallel(num_episodes=10000, num_processes=None):
-    if num_processes is None:
-        num_processes = mp.cpu_count()
+#     if num_processes is None:
+#         num_processes = mp.cpu_count()
 
-    episodes_per_process = num_episodes // num_processes
-    manager = mp.Manager()
-    shared_q = manager.Queue()
+#     episodes_per_process = num_episodes // num_processes
+#     manager = mp.Manager()
+#     shared_q = manager.Queue()
 
-    with mp.Pool(num_processes) as pool:
-        workers = [pool.apply_async(train_ai_worker, (episodes_per_process, shared_q, i)) for i in range(num_processes)]
+#     with mp.Pool(num_processes) as pool:
+#         workers = [pool.apply_async(train_ai_worker, (episodes_per_process, shared_q, i)) for i in range(num_processes)]
         
-        with tqdm(total=num_episodes, desc="Training Progress") as pbar:
-            q_tables = []
-            completed_episodes = 0
-            while completed_episodes < num_episodes or len(q_tables) < num_processes:
-                try:
-                    result = shared_q.get(timeout=1)  # Add a timeout
-                    if isinstance(result, tuple) and result[0] == 'q_table':
-                        q_tables.append(result[1])
-                    else:
-                        completed_episodes += 1
-                        pbar.update(1)
-                except queue.Empty:
-                    # Check if all workers are done
-                    if all(worker.ready() for worker in workers):
-                        break
-
-        # Ensure all workers have finished
-        for worker in workers:
-            worker.wait()
-
-        # Collect any remaining Q-tables
-        while not shared_q.empty():
-            result = shared_q.get()
-            if isinstance(result, tuple) and result[0] == 'q_table':
-                q_tables.append(result[1])
-
-    # Combine Q-tables from all processes
-    combined_q_table = defaultdict(KubaAI.default_dict_factory)
-    for q_table in q_tables:
-        for state, actions in q_table.items():
-            for action, value in actions.items():
-                combined_q_table[state][action] += value / num_processes
+#         with tqdm(total=num_episodes, desc="Training Progress") as pbar:
+#             q_tables = []
+#             completed_episodes = 0
+#             while completed_episodes < num_episodes or len(q_tables) < num_processes:
+#                 try:
+#                     result = shared_q.get(timeout=1)  # Add a timeout
+#                     if isinstance(result, tuple) and result[0] == 'q_table':
+#                         q_tables.append(result[1])
+#                     else:
+#                         completed_episodes += 1
+#                         pbar.update(1)
+#                 except queue.Empty:
+#                     # Check if all workers are done
+#                     if all(worker.ready() for worker in workers):
+#                         break
 
-    ai = KubaAI()
-    ai.q_table = combined_q_table
-    return ai
+#         # Ensure all workers have finished
+#         for worker in workers:
+#             worker.wait()
+
+#         # Collect any remaining Q-tables
+#         while not shared_q.empty():
+#             result = shared_q.get()
+#             if isinstance(result, tuple) and result[0] == 'q_table':
+#                 q_tables.append(result[1])
+
+#     # Combine Q-tables from all processes
+#     combined_q_table = defaultdict(KubaAI.default_dict_factory)
+#     for q_table in q_tables:
+#         for state, actions in q_table.items():
+#             for action, value in actions.items():
+#                 combined_q_table[state][action] += value / num_processes
+
+#     ai = KubaAI()
+#     ai.q_table = combined_q_table
+#     return ai
 
 def train_or_load_ai(filename, training_episodes=10000):
     try:
         ai = KubaAI()
         ai.load_model(filename)
         print("Loaded pre-trained AI model.")
-        return ai
     except FileNotFoundError:
         print(f"No pre-trained model found. Training new AI with {training_episodes} episodes...")
         ai = train_ai(training_episodes)
         ai.save_model(filename)
         print("AI training complete and model saved.")
-        return ai
+    # tuned evaluation weights, see ai/tune.py
+    if os.path.exists(WEIGHTS_FILE):
+        ai.load_weights(WEIGHTS_FILE)
+        print("Loaded evaluation weights.")
+    return ai
 
 AI_MODEL_FILE = "./ai/models/kuba_ai_model.pkl"
\ No newline at end of file
@@ -0,0 +1,73 @@
+import random
+import time
+
+from game.kuba_game import decode_move
+
+class Ponderer:
+    # searches the opponent's likely replies while they think, a little work per call to step()
+    # so it fits between frames (pygbag has no threads)
+    def __init__(self, ai, depth=None):
+        self.ai = ai
+        self.depth = depth or ai.look_ahead_depth
+        self.root = None
+        # best reply move id by packed position after the opponent's move
+        self.replies = {}
+        self.hits = 0
+        self.misses = 0
+        self._work = None
+
+    def step(self, game, budget=0.008):
+        # call on the opponent's turn, returns True while there is pondering left to do
+        if game.winner:
+            return False
+        root = game.pack()
+        if root != self.root:
+            self.root = root
+            self.replies = {}
+            self._work = self._ponder(game.clone())
+        if self._work is None:
+            return False
+
+        deadline = time.perf_counter() + budget
+        for _ in self._work:
+            if time.perf_counter() >= deadline:
+                return True
+        self._work = None
+        return False
+
+    def _ponder(self, game):
+        replies = []
+        for move in game.get_valid_move_ids():
+            position = game.clone()
+            position.make_move_id(move)
+            if not position.winner:
+                replies.append((self.ai.evaluate_leaf(position), position))
+        # replies that leave the bot worst off first, those are the ones a good opponent plays
+        replies.sort(key=lambda reply: reply[0])
+
+        for _, position in replies:
+            best_score = float('-inf')
+            best_move = None
+            # the same loop as KubaAI.get_best_move, so a pondered answer is the move it would pick
+            for move in position.get_valid_move_ids():
+                new_game = position.clone()
+                new_game.make_move_id(move)
+                score = -self.ai.search(new_game, self.depth - 1)
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+                yield
+            self.replies[position.pack()] = best_move
+
+    def get_action(self, game):
+        # KubaAI.get_action, answered instantly when the opponent played a pondered reply
+        if random.random() < self.ai.epsilon:
+            return random.choice(game.get_valid_moves())
+
+        move = self.replies.get(game.pack())
+        if move is not None:
+            self.hits += 1
+            return decode_move(move)
+        # the transposition table still holds whatever was searched below this position
+        self.misses += 1
+        return self.ai.analyze(game, self.depth, top_k=1).best_move
@@ -0,0 +1,307 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from hashlib import blake2b
+from itertools import count
+from types import MappingProxyType
+
+from ai.cache import ResultCache
+from ai.kuba_ai import KubaAI, AI_MODEL_FILE, WEIGHTS_FILE, load_weights
+from game.kuba_game import KubaGame, MOVES, encode_move
+
+# Many games against bots in one process. What every game would otherwise own is shared:
+# - the Q-table model is converted once to a flat file that is memory-mapped read-only. It is
+#   only there for Q-value lookups through manager.model or manager.engine.q_table, the bots
+#   choose their moves by search
+# - one KubaAI searches for every game, its transposition table and a cache of chosen moves
+#   are shared and bounded
+# - a session between moves is only its packed position, the KubaGame objects that moves are
+#   played on come from a pool and go back to it
+
+SHARED_MODEL_FILE = "./ai/models/kuba_ai_model.qtab"
+START_PACKED = KubaGame().pack()
+
+# model file, native byte order: header, sorted state keys, per state offsets into the entries,
+# the entries' Q values and then their move ids
+_MAGIC = b"KUBAQTB1"
+_HEADER = struct.Struct("=8sQQ")
+
+
+def _state_hash(state):
+    # a stable 64 bit key for a KubaAI.get_state_key() tuple
+    grid, color = state
+    text = "".join(marble.color.value if marble else "." for row in grid for marble in row) + color
+    return int.from_bytes(blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class SharedModel:
+    # a read-only Q-table behind the same lookups as KubaAI.q_table: model[state][action]
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, states, entries = _HEADER.unpack_from(view)
+        if magic != _MAGIC:
+            view.release()
+            self.close()
+            raise ValueError(f"{path} is not a shared model file")
+
+        offset = _HEADER.size
+        self._keys = view[offset:offset + 8 * states].cast("Q")
+        offset += 8 * states
+        self._offsets = view[offset:offset + 4 * (states + 1)].cast("I")
+        offset += 4 * (states + 1)
+        offset += -offset % 8
+        self._values = view[offset:offset + 8 * entries].cast("d")
+        offset += 8 * entries
+        self._moves = view[offset:offset + 2 * entries].cast("H")
+        self._view = view
+
+    @staticmethod
+    def build(q_table, path):
+        merged = {}
+        for state, actions in q_table.items():
+            entry = merged.setdefault(_state_hash(state), {})
+            for action, value in actions.items():
+                entry[encode_move(*action)] = value
+
+        keys = array("Q", sorted(merged))
+        offsets = array("I", [0])
+        values = array("d")
+        moves = array("H")
+        for key in keys:
+            for move, value in sorted(merged[key].items()):
+                moves.append(move)
+                values.append(value)
+            offsets.append(len(moves))
+
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(keys), len(moves)))
+            f.write(keys.tobytes())
+            f.write(offsets.tobytes())
+            f.write(b"\0" * (-(_HEADER.size + 8 * len(keys) + 4 * len(offsets)) % 8))
+            f.write(values.tobytes())
+            f.write(moves.tobytes())
+
+    def _index(self, state):
+        key = _state_hash(state)
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return index
+        return None
+
+    def __getitem__(self, state):
+        index = self._index(state)
+        if index is None:
+            return MappingProxyType({})
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return MappingProxyType({MOVES[self._moves[i]]: self._values[i] for i in range(start, end)})
+
+    def __contains__(self, state):
+        return self._index(state) is not None
+
+    def __len__(self):
+        return len(self._keys)
+
+    def close(self):
+        for name in ("_keys", "_offsets", "_values", "_moves", "_view"):
+            view = getattr(self, name, None)
+            if view is not None:
+                view.release()
+        self._map.close()
+        self._file.close()
+
+
+_open_models = {}
+
+
+def open_model(path=SHARED_MODEL_FILE, source=AI_MODEL_FILE):
+    # every manager in the process gets the same mapping, the file is built from the pickled
+    # model the first time
+    path = os.path.realpath(path)
+    model = _open_models.get(path)
+    if model is None:
+        if not os.path.exists(path):
+            ai = KubaAI()
+            ai.load_model(source)
+            SharedModel.build(ai.q_table, path)
+        model = _open_models[path] = SharedModel(path)
+    return model
+
+
+def close_model(path=SHARED_MODEL_FILE):
+    # closes a model opened by open_model(), managers still using it must not look anything up
+    model = _open_models.pop(os.path.realpath(path), None)
+    if model is not None:
+        model.close()
+
+
+class GamePool:
+    # KubaGame objects lent to one session at a time
+    def __init__(self, max_size=64):
+        self.max_size = max_size
+        self.free = []
+        self.created = 0
+
+    def acquire(self, packed, moves=0):
+        if self.free:
+            game = self.free.pop()
+        else:
+            game = KubaGame()
+            self.created += 1
+        game.unpack(packed, moves)
+        return game
+
+    def release(self, game):
+        if len(self.free) < self.max_size:
+            self.free.append(game)
+
+
+class Session:
+    __slots__ = ('id', 'packed', 'moves', 'depth', 'epsilon')
+
+    def __init__(self, id, packed, moves, depth, epsilon):
+        self.id = id
+        self.packed = packed
+        self.moves = moves
+        self.depth = depth
+        self.epsilon = epsilon
+
+
+class SessionManager:
+    def __init__(self, model=None, depth=2, epsilon=0, weights=None, max_transpositions=200_000,
+                 cache_size=100_000, pool_size=64, seed=None):
+        self.model = model
+        if weights is None and os.path.exists(WEIGHTS_FILE):
+            weights = load_weights(WEIGHTS_FILE)
+        self.engine = KubaAI(epsilon=0, look_ahead_depth=depth, max_transpositions=max_transpositions,
+                             weights=weights)
+        if model is not None:
+            self.engine.q_table = model
+        # best move id by (packed position, depth), for positions many games go through
+        self.best_moves = ResultCache(cache_size)
+        self.pool = GamePool(pool_size)
+        self.sessions = {}
+        self.rng = random.Random(seed)
+        self._ids = count(1)
+
+    def open(self, notation=None, depth=None, epsilon=None):
+        if notation:
+            game = KubaGame.from_notation(notation)
+            packed, moves = game.pack(), game.moves
+        else:
+            packed, moves = START_PACKED, 0
+        session = Session(next(self._ids), packed, moves,
+                          depth or self.engine.look_ahead_depth,
+                          self.engine.epsilon if epsilon is None else epsilon)
+        self.sessions[session.id] = session
+        return session.id
+
+    def close(self, session_id):
+        del self.sessions[session_id]
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @contextmanager
+    def game(self, session_id):
+        # the session's game on a pooled KubaGame, moves made on it are kept
+        session = self.sessions[session_id]
+        game = self.pool.acquire(session.packed, session.moves)
+        try:
+            yield game
+            session.packed = game.pack()
+            session.moves = game.moves
+        finally:
+            self.pool.release(game)
+
+    def play(self, session_id, coordinates, direction):
+        # the player's move and the bot's answer, which is None once the game is over
+        with self.game(session_id) as game:
+            if game.current_player.name == "Bot":
+                raise ValueError("It is the bot's turn")
+            if not game.make_move(coordinates, direction):
+                raise ValueError(game.alert.message if game.alert else "Illegal move")
+            return self._reply(self.sessions[session_id], game)
+
+    def bot_move(self, session_id):
+        # lets the bot move, for games it starts
+        with self.game(session_id) as game:
+            if game.current_player.name != "Bot":
+                raise ValueError("It is the player's turn")
+            return self._reply(self.sessions[session_id], game)
+
+    def _reply(self, session, game):
+        if game.winner:
+            return None
+        if self.rng.random() < session.epsilon:
+            move = self.rng.choice(game.get_valid_moves())
+        else:
+            key = (game.pack(), session.depth)
+            move_id = self.best_moves.get(key)
+            if move_id is None:
+                move = self.engine.analyze(game, session.depth, top_k=1).best_move
+                self.best_moves.put(key, encode_move(*move))
+            else:
+                move = MOVES[move_id]
+        game.make_move(*move)
+        return move
+
+
+def simulate(manager, games, plies, seed=0):
+    # games played side by side, one move of every game per round, the player moving at random
+    rng = random.Random(seed)
+    ids = [manager.open() for _ in range(games)]
+    replies = 0
+    for _ in range(plies):
+        for session_id in ids:
+            with manager.game(session_id) as game:
+                if game.winner:
+                    continue
+                move = rng.choice(game.get_valid_moves())
+            if manager.play(session_id, *move):
+                replies += 1
+    return ids, replies
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many games against bots sharing one model and search")
+    parser.add_argument("--convert", action="store_true", help="only build the shared model file from the pickled model")
+    parser.add_argument("--model", default=SHARED_MODEL_FILE)
+    parser.add_argument("--source", default=AI_MODEL_FILE, help="pickled model the shared model is built from")
+    parser.add_argument("--games", type=int, default=1000, help="concurrent games to simulate")
+    parser.add_argument("--plies", type=int, default=5, help="player moves per game")
+    parser.add_argument("--depth", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.convert:
+        ai = KubaAI()
+        ai.load_model(args.source)
+        SharedModel.build(ai.q_table, args.model)
+        print(f"{len(ai.q_table)} states written to {args.model}")
+    else:
+        model = open_model(args.model, args.source)
+        tracemalloc.start()
+        manager = SessionManager(model, depth=args.depth, seed=0)
+        manager.open()
+        before = tracemalloc.get_traced_memory()[0]
+        ids = [manager.open() for _ in range(args.games)]
+        per_game = (tracemalloc.get_traced_memory()[0] - before) / args.games
+        for session_id in ids:
+            manager.close(session_id)
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        _, replies = simulate(manager, args.games, args.plies)
+        elapsed = time.perf_counter() - start
+        print(f"{per_game:.0f} bytes per open game, {args.games} games")
+        print(f"{replies} bot replies in {elapsed:.1f}s ({replies / elapsed:.0f}/s), "
+              f"{len(manager.best_moves)} cached moves, {manager.pool.created} game objects")
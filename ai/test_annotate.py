@@ -0,0 +1,88 @@
+import io
+import json
+import os
+import random
+import tempfile
+import unittest
+from ai.annotate import annotate, read_games
+from game.kuba_game import KubaGame, format_move
+
+def random_game(seed, plies):
+    rng = random.Random(seed)
+    game = KubaGame()
+    moves = []
+    while len(moves) < plies and not game.winner:
+        move = rng.choice(game.get_valid_moves())
+        game.make_move(*move)
+        moves.append(format_move(*move))
+    return moves
+
+class TestAnnotate(unittest.TestCase):
+
+    def setUp(self):
+        # the same opening twice, so positions repeat
+        self.games = [
+            {"id": "a", "moves": random_game(1, 6)},
+            {"id": "b", "moves": random_game(1, 6)},
+            {"id": "c", "moves": random_game(2, 4)},
+        ]
+
+    def test_annotations_mark_best_moves(self):
+        output = io.StringIO()
+        stats = annotate(self.games, output, depth=1, workers=1, chunk_games=2)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line["id"] for line in lines], ["a", "b", "c"])
+        self.assertEqual(lines[0]["annotations"], lines[1]["annotations"])
+        for annotation in lines[0]["annotations"]:
+            self.assertGreaterEqual(annotation["best_score"], annotation["score"])
+            self.assertEqual(annotation["blunder"], annotation["loss"] >= 10)
+        self.assertEqual(stats["positions"], 16)
+        # game b repeats game a and both start from the same position as c
+        self.assertEqual(stats["analyzed"], 6 + 3)
+
+    def test_illegal_move_stops_the_game(self):
+        output = io.StringIO()
+        annotate([{"id": 1, "moves": ["00R", "00R"]}], output, depth=1, workers=1)
+        line = json.loads(output.getvalue())
+        self.assertEqual(len(line["annotations"]), 1)
+        self.assertEqual(line["error"], "Illegal move 00R at ply 2: Can't move an empy cell!")
+
+    def test_bad_records_do_not_stop_the_run(self):
+        output = io.StringIO()
+        records = [self.games[0], {"id": "start", "start": "bogus", "moves": []}, {"id": "none"},
+                   {"id": "move", "moves": [7]}, self.games[2]]
+        stats = annotate(records, output, depth=1, workers=1)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line["id"] for line in lines], ["a", "start", "none", "move", "c"])
+        self.assertEqual(["error" in line for line in lines], [False, True, True, True, False])
+        self.assertEqual(stats["games"], 5)
+
+    def test_worker_pool_matches_inline(self):
+        inline = io.StringIO()
+        pooled = io.StringIO()
+        annotate(self.games, inline, depth=1, workers=1)
+        annotate(self.games, pooled, depth=1, workers=2)
+        self.assertEqual(inline.getvalue(), pooled.getvalue())
+
+    def test_read_games_streams_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.jsonl")
+            with open(path, "w") as f:
+                f.write("# archive\n")
+                for game in self.games:
+                    f.write(json.dumps({"moves": game["moves"]}) + "\n")
+            self.assertEqual([game["id"] for game in read_games(path)], [2, 3, 4])
+
+    def test_read_games_reports_broken_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.jsonl")
+            with open(path, "w") as f:
+                f.write('{"moves": ["00R"]}\n{"moves": [\n[1, 2]\n')
+            games = list(read_games(path))
+        self.assertEqual([game["id"] for game in games], [1, 2, 3])
+        self.assertNotIn("error", games[0])
+        self.assertIn("Invalid JSON on line 2", games[1]["error"])
+        self.assertIn("not a JSON object", games[2]["error"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+import unittest
+from ai.cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+
+    def test_result_cache_is_bounded(self):
+        cache = ResultCache(2)
+        cache.put(1, "one")
+        cache.put(2, "two")
+        cache.get(1)
+        cache.put(3, "three")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1), "one")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from ai.kuba_ai import KubaAI, AI_MODEL_FILE, DEFAULT_WEIGHTS, EVALUATION_FEATURES, WIN_SCORE, evaluation_features, load_weights, save_weights
+from game.kuba_game import KubaGame, Direction, Marble, MarbleColor, Player
+
+class TestKubaAI(unittest.TestCase):
+
+    def setUp(self):
+        self.ai = KubaAI(epsilon=0)
+        self.game = KubaGame()
+        rng = random.Random(5)
+        for _ in range(12):
+            self.game.make_move(*rng.choice(self.game.get_valid_moves()))
+
+    def test_analysis_agrees_with_minimax(self):
+        analysis = self.ai.analyze(self.game, max_depth=2, top_k=100)
+        self.assertEqual(analysis.depth, 2)
+        self.assertEqual(analysis.best_move, KubaAI(epsilon=0).get_best_move(self.game, 2))
+        self.assertEqual(len(analysis.moves), len(self.game.get_valid_moves()))
+        for move in analysis.moves:
+            new_game = self.game.clone()
+            new_game.make_move(*move.move)
+            self.assertEqual(move.score, KubaAI().minimax(new_game, 1, False))
+
+    def test_top_moves_are_sorted_with_principal_variations(self):
+        analysis = self.ai.analyze(self.game, max_depth=3, top_k=3)
+        self.assertEqual(len(analysis.moves), 3)
+        scores = [move.score for move in analysis.moves]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for move in analysis.moves:
+            self.assertEqual(move.pv[0], move.move)
+            game = self.game.clone()
+            for coordinates, direction in move.pv:
+                self.assertTrue(game.make_move(coordinates, direction))
+
+    def test_consecutive_calls_reuse_work(self):
+        first = self.ai.analyze(self.game, max_depth=3)
+        self.assertGreater(first.nodes, 0)
+        self.assertEqual(self.ai.analyze(self.game, max_depth=3).nodes, 0)
+        # one ply later the other player is to move, scores cached for either side still count
+        self.game.make_move(*first.best_move)
+        self.assertEqual(self.ai.analyze(self.game, max_depth=2).nodes, 0)
+        fresh = KubaAI(epsilon=0).analyze(self.game, max_depth=3)
+        stepped = self.ai.analyze(self.game, max_depth=3)
+        self.assertLess(stepped.nodes, fresh.nodes)
+        self.assertEqual([move.score for move in stepped.moves], [move.score for move in fresh.moves])
+
+    def test_repeated_calls_keep_deepening(self):
+        self.assertEqual(self.ai.analyze(self.game).depth, self.ai.look_ahead_depth)
+        self.assertEqual(self.ai.searched_depth(self.game), self.ai.look_ahead_depth)
+        self.assertEqual(self.ai.analyze(self.game).depth, self.ai.look_ahead_depth + 1)
+        # a move later the position was already searched one ply less deep
+        self.game.make_move(*self.ai.analyze(self.game, max_depth=3).best_move)
+        self.assertEqual(self.ai.searched_depth(self.game), 2)
+        self.assertEqual(self.ai.analyze(self.game).depth, 3)
+
+    def test_scores_are_symmetric(self):
+        self.assertEqual(self.ai.evaluate_leaf(self.game),
+                         self.ai.evaluate_state(self.game) - self.ai.evaluate_state(self.game, self.game.opponent))
+        self.assertEqual(self.ai.search(self.game, 2), self.ai.minimax(self.game, 2, True))
+        self.assertEqual(self.ai.search(self.game, 2), -self.ai.minimax(self.game, 2, False))
+
+    def test_finished_game_has_no_moves(self):
+        game = KubaGame.from_notation("WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 7 0 - 0")
+        analysis = self.ai.analyze(game)
+        self.assertIsNone(analysis.best_move)
+
+    def test_evaluation_is_weighted_features(self):
+        weights = dict(DEFAULT_WEIGHTS, center=7, victory=-1)
+        features = dict(zip(DEFAULT_WEIGHTS, evaluation_features(self.game)))
+        expected = sum(weights[name] * features[name] for name in weights)
+        self.assertEqual(KubaAI(weights=weights).evaluate_state(self.game), expected)
+
+    def test_distance_to_victory_is_relative(self):
+        game = KubaGame.from_notation("WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 3 1 - 0")
+        white, black = game.players if game.players[0].color.value == "W" else game.players[::-1]
+        victory = EVALUATION_FEATURES.index("victory")
+        self.assertEqual(evaluation_features(game, white)[victory], 2)
+        self.assertEqual(evaluation_features(game, black)[victory], -2)
+
+    def test_features_find_the_player_by_color(self):
+        game = self.game.clone()
+        player = self.game.current_player
+        game.make_move(*game.get_valid_moves()[0])
+        own = game.players[self.game.current_player_index]
+        self.assertEqual(evaluation_features(game, player), evaluation_features(game, own))
+        with self.assertRaises(ValueError):
+            evaluation_features(game, Player("Nobody", MarbleColor.RED))
+
+    def test_changing_weights_clears_cached_scores(self):
+        self.ai.analyze(self.game)
+        self.ai.set_weights(dict(DEFAULT_WEIGHTS, material=0))
+        self.assertEqual(self.ai.transpositions, {})
+
+    def test_changing_quiescence_depth_clears_cached_scores(self):
+        self.ai.analyze(self.game)
+        self.ai.quiescence_depth = 0
+        self.assertEqual(self.ai.transpositions, {})
+        self.assertEqual(self.ai.analyze(self.game, top_k=100).moves[0].score,
+                         KubaAI(epsilon=0, quiescence_depth=0).analyze(self.game, top_k=100).moves[0].score)
+
+    def test_weights_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "weights.json")
+            save_weights(dict(DEFAULT_WEIGHTS, edge=0.5), path)
+            self.assertEqual(load_weights(path), dict(DEFAULT_WEIGHTS, edge=0.5))
+            with open(path, "w") as f:
+                json.dump({"center": 2}, f)
+            self.assertEqual(load_weights(path), dict(DEFAULT_WEIGHTS, center=2))
+            for bad in ({"mobility": 1}, {"center": "2"}, [1, 2]):
+                with open(path, "w") as f:
+                    json.dump(bad, f)
+                with self.assertRaises(ValueError):
+                    load_weights(path)
+
+    def capture_negamax(self, ai, game, depth):
+        # quiesce() without pruning
+        score = ai.evaluate_leaf(game)
+        if depth == 0 or game.winner:
+            return score
+        for move in game.get_capture_move_ids():
+            new_game = game.clone()
+            new_game.make_move_id(move)
+            score = max(score, -self.capture_negamax(ai, new_game, depth - 1))
+        return score
+
+    def test_quiescence_is_exact(self):
+        rng = random.Random(3)
+        game = KubaGame()
+        while not game.winner:
+            self.assertEqual(self.ai.quiesce(game, 4), self.capture_negamax(self.ai, game, 4))
+            game.make_move(*rng.choice(game.get_valid_moves()))
+
+    def test_quiet_position_is_scored_as_it_is(self):
+        game = KubaGame()
+        self.assertEqual(game.get_capture_move_ids(), [])
+        self.assertEqual(self.ai.quiesce(game, 4), self.ai.evaluate_leaf(game))
+
+    def test_won_game_is_scored_for_the_winner(self):
+        game = KubaGame.from_notation("5WB/WW1R3/2RRR2/1RRRRR1/2RRR2/3R1WW/5WW W 0 0 - 0")
+        self.assertEqual(KubaAI(epsilon=0).get_best_move(game, 1), ((0, 5), Direction.RIGHT))
+        game.make_move((0, 5), Direction.RIGHT)
+        self.assertEqual(self.ai.evaluate_leaf(game), -WIN_SCORE)
+        self.assertEqual(self.ai.minimax(game, 0, False), WIN_SCORE)
+
+    def test_without_quiescence_leaves_are_static(self):
+        ai = KubaAI(epsilon=0, quiescence_depth=0)
+        self.assertEqual(ai.minimax(self.game, 0, True), ai.evaluate_leaf(self.game))
+
+    def test_loaded_model_uses_shared_marbles(self):
+        ai = KubaAI()
+        ai.load_model(AI_MODEL_FILE)
+        for board_state, *_ in ai.q_table:
+            for row in board_state:
+                for marble in row:
+                    self.assertTrue(marble is None or marble is Marble(marble.color))
+        # states after a move match too, the KO state is not part of the key
+        game = KubaGame()
+        self.assertIn(ai.get_state_key(game), ai.q_table)
+        game.make_move((0, 0), Direction.RIGHT)
+        self.assertIsNotNone(game.last_move)
+        self.assertIn(ai.get_state_key(game), ai.q_table)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.pkl")
+            ai.save_model(path)
+            loaded = KubaAI()
+            loaded.load_model(path)
+        self.assertEqual(loaded.q_table, ai.q_table)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from ai.kuba_ai import KubaAI
+from ai.ponder import Ponderer
+from game.kuba_game import KubaGame
+
+class TestPonderer(unittest.TestCase):
+
+    def setUp(self):
+        self.ponderer = Ponderer(KubaAI(epsilon=0))
+        self.game = KubaGame()
+
+    def ponder(self):
+        while self.ponderer.step(self.game, budget=0.001):
+            pass
+
+    def test_every_reply_is_pondered(self):
+        self.ponder()
+        self.assertEqual(len(self.ponderer.replies), len(self.game.get_valid_moves()))
+
+    def test_pondered_answer_matches_a_fresh_search(self):
+        self.ponder()
+        for move in self.game.get_valid_moves():
+            game = self.game.clone()
+            game.make_move(*move)
+            self.assertEqual(self.ponderer.get_action(game), KubaAI(epsilon=0).get_best_move(game, 2))
+        self.assertEqual(self.ponderer.hits, len(self.game.get_valid_moves()))
+
+    def test_unpondered_position_is_searched(self):
+        self.ponderer.step(self.game, budget=0)
+        self.game.make_move(*self.game.get_valid_moves()[-1])
+        self.assertEqual(self.ponderer.get_action(self.game), KubaAI(epsilon=0).get_best_move(self.game, 2))
+        self.assertEqual(self.ponderer.misses, 1)
+
+    def test_new_position_restarts_pondering(self):
+        self.ponder()
+        self.game.make_move(*self.game.get_valid_moves()[0])
+        self.game.make_move(*self.game.get_valid_moves()[0])
+        self.assertTrue(self.ponderer.step(self.game, budget=0))
+        self.assertEqual(self.ponderer.replies, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+from ai.kuba_ai import KubaAI, AI_MODEL_FILE
+from ai.sessions import SessionManager, SharedModel, close_model, open_model
+from game.kuba_game import KubaGame, Direction, START_NOTATION
+
+class TestSharedModel(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "model.qtab")
+
+    def tearDown(self):
+        close_model(self.path)
+        self.directory.cleanup()
+
+    def test_lookups_match_the_q_table(self):
+        ai = KubaAI()
+        game = KubaGame()
+        q_table = {ai.get_state_key(game): {move: 1.5 for move in game.get_valid_moves()[:3]}}
+        game.make_move((0, 0), Direction.RIGHT)
+        q_table[ai.get_state_key(game)] = {((0, 6), Direction.LEFT): -2.0}
+        SharedModel.build(q_table, self.path)
+        model = SharedModel(self.path)
+        try:
+            self.assertEqual(len(model), 2)
+            for state, actions in q_table.items():
+                self.assertIn(state, model)
+                self.assertEqual(dict(model[state]), actions)
+            game.make_move((0, 6), Direction.LEFT)
+            self.assertNotIn(ai.get_state_key(game), model)
+            self.assertEqual(dict(model[ai.get_state_key(game)]), {})
+        finally:
+            model.close()
+
+    def test_pickled_model_converts(self):
+        ai = KubaAI()
+        ai.load_model(AI_MODEL_FILE)
+        SharedModel.build(ai.q_table, self.path)
+        model = SharedModel(self.path)
+        try:
+            self.assertEqual(len(model), len(ai.q_table))
+            for state, actions in ai.q_table.items():
+                self.assertEqual(dict(model[state]), dict(actions))
+            self.assertIn(ai.get_state_key(KubaGame()), model)
+        finally:
+            model.close()
+
+    def test_model_is_read_only_and_opened_once(self):
+        model = open_model(self.path)
+        self.assertIs(open_model(self.path), model)
+        manager = SessionManager(model)
+        state = manager.engine.get_state_key(KubaGame())
+        self.assertIs(manager.engine.q_table, model)
+        action = next(iter(model[state]))
+        with self.assertRaises(TypeError):
+            manager.engine.update_q_value(state, action, state, 1, False)
+        close_model(self.path)
+        self.assertIsNot(open_model(self.path), model)
+
+class TestSessionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = SessionManager()
+
+    def test_bot_answers_like_a_fresh_search(self):
+        session = self.manager.open()
+        reply = self.manager.play(session, (0, 0), Direction.RIGHT)
+        game = KubaGame()
+        game.make_move((0, 0), Direction.RIGHT)
+        self.assertEqual(reply, KubaAI(epsilon=0).get_best_move(game, 2))
+        game.make_move(*reply)
+        with self.manager.game(session) as hosted:
+            self.assertEqual(hosted.pack(), game.pack())
+            self.assertEqual(hosted.moves, 2)
+
+    def test_illegal_move_leaves_the_game_alone(self):
+        session = self.manager.open()
+        with self.assertRaises(ValueError):
+            self.manager.play(session, (3, 3), Direction.LEFT)
+        with self.assertRaises(ValueError):
+            self.manager.bot_move(session)
+        with self.manager.game(session) as game:
+            self.assertEqual(game.to_notation(), START_NOTATION)
+
+    def test_bot_can_start(self):
+        session = self.manager.open(START_NOTATION.replace(" W ", " B "))
+        self.assertIsNotNone(self.manager.bot_move(session))
+        with self.manager.game(session) as game:
+            self.assertEqual(game.current_player.name, "You")
+
+    def test_games_share_moves_and_game_objects(self):
+        sessions = [self.manager.open() for _ in range(5)]
+        self.manager.play(sessions[0], (0, 0), Direction.RIGHT)
+        nodes = self.manager.engine.nodes
+        for session in sessions[1:]:
+            self.manager.play(session, (0, 0), Direction.RIGHT)
+        self.assertEqual(self.manager.engine.nodes, nodes)
+        self.assertEqual(self.manager.pool.created, 1)
+
+    def test_open_games_are_small(self):
+        self.manager.open()
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            sessions = [self.manager.open() for _ in range(1000)]
+            for session in sessions[:100]:
+                self.manager.play(session, (0, 0), Direction.RIGHT)
+            per_game = (tracemalloc.get_traced_memory()[0] - before) / len(sessions)
+        finally:
+            tracemalloc.stop()
+        self.assertLess(per_game, 512)
+
+if __name__ == '__main__':
+    unittest.main()
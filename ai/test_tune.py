@@ -0,0 +1,43 @@
+import unittest
+import numpy as np
+from ai.kuba_ai import KubaAI, DEFAULT_WEIGHTS, EVALUATION_FEATURES
+from ai.tune import candidate_scores, losses, self_play, tune
+from game.kuba_game import Direction, encode_move
+from game.perft import fixture
+
+class TestTune(unittest.TestCase):
+
+    def test_self_play_positions(self):
+        features, outcomes = self_play(3, seed=1)
+        self.assertEqual(features.shape, (len(outcomes), len(EVALUATION_FEATURES)))
+        self.assertGreater(len(outcomes), 0)
+        self.assertTrue(set(outcomes) <= {0.0, 1.0})
+
+    def test_captures_score_higher_for_the_mover(self):
+        game = fixture("capture")
+        moves = game.get_valid_move_ids()
+        scores = dict(zip(moves, candidate_scores(KubaAI(epsilon=0), game, moves)))
+        capture = scores.pop(encode_move((1, 3), Direction.DOWN))
+        self.assertGreater(capture, max(scores.values()))
+
+    def test_batched_losses_match_one_by_one(self):
+        rng = np.random.default_rng(0)
+        features = rng.normal(size=(50, len(EVALUATION_FEATURES)))
+        outcomes = (rng.random(50) < 0.5).astype(float)
+        candidates = rng.normal(size=(30, len(EVALUATION_FEATURES)))
+        batched = losses(candidates, features, outcomes, 0.5, batch_cells=200)
+        single = [losses(candidate, features, outcomes, 0.5)[0] for candidate in candidates]
+        np.testing.assert_allclose(batched, single)
+
+    def test_tuning_lowers_the_loss(self):
+        # outcomes decided by material alone
+        rng = np.random.default_rng(1)
+        features = rng.integers(-4, 5, size=(400, len(EVALUATION_FEATURES))).astype(float)
+        outcomes = (features[:, EVALUATION_FEATURES.index("material")] > 0).astype(float)
+        weights, scale = tune(features, outcomes, generations=10, population=200)
+        start = np.array([DEFAULT_WEIGHTS[name] for name in EVALUATION_FEATURES], dtype=float)
+        tuned = np.array([weights[name] for name in EVALUATION_FEATURES])
+        self.assertLess(losses(tuned, features, outcomes, scale)[0], losses(start, features, outcomes, scale)[0])
+
+if __name__ == '__main__':
+    unittest.main()
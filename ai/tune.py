@@ -0,0 +1,147 @@
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+from ai.kuba_ai import KubaAI, DEFAULT_WEIGHTS, EVALUATION_FEATURES, WEIGHTS_FILE, evaluation_features, save_weights
+from game.kuba_game import KubaGame
+
+# Tunes the evaluation weights on self-play positions: every position's features are stored with
+# whether the player to move went on to win, and the weights are fitted so that
+# sigmoid(scale * score) predicts that outcome. The features are the player to move's minus the
+# opponent's, so score is the one KubaAI.evaluate_leaf() searches with. Scoring is one matrix product per batch of
+# candidate weight sets, so whole populations are compared at once.
+
+
+def position_features(game):
+    own = evaluation_features(game, game.current_player)
+    other = evaluation_features(game, game.opponent)
+    return tuple(a - b for a, b in zip(own, other))
+
+
+def candidate_scores(ai, game, moves):
+    # every move's score for the player making it, the opponent is to move after it
+    scores = []
+    for move in moves:
+        new_game = game.clone()
+        new_game.make_move_id(move)
+        scores.append(-ai.evaluate_leaf(new_game))
+    return scores
+
+
+def self_play(games, seed=0, epsilon=0.2, max_plies=1000, skip_opening=4, weights=None):
+    # epsilon-greedy one-ply play; positions of games that did not finish are dropped
+    rng = random.Random(seed)
+    ai = KubaAI(epsilon=0, weights=weights)
+    features = []
+    outcomes = []
+    for _ in range(games):
+        game = KubaGame()
+        positions = []
+        while not game.winner and len(positions) < max_plies:
+            positions.append((position_features(game), game.current_player_index))
+            moves = game.get_valid_move_ids()
+            if rng.random() < epsilon:
+                move = rng.choice(moves)
+            else:
+                scores = candidate_scores(ai, game, moves)
+                move = moves[scores.index(max(scores))]
+            game.make_move_id(move)
+        if not game.winner:
+            continue
+        winner = game.players.index(game.winner)
+        for position, player in positions[skip_opening:]:
+            features.append(position)
+            outcomes.append(player == winner)
+    return np.array(features, dtype=np.float64).reshape(-1, len(EVALUATION_FEATURES)), np.array(outcomes, dtype=np.float64)
+
+
+def losses(candidates, features, outcomes, scale, batch_cells=4_000_000):
+    # mean squared error of every candidate's predicted outcomes, candidates is (n, features)
+    candidates = np.atleast_2d(candidates)
+    result = np.empty(len(candidates))
+    batch = max(1, batch_cells // max(1, len(features)))
+    for start in range(0, len(candidates), batch):
+        scores = features @ candidates[start:start + batch].T
+        predicted = 1 / (1 + np.exp(-scale * scores))
+        result[start:start + batch] = ((predicted - outcomes[:, None]) ** 2).mean(axis=0)
+    return result
+
+
+def fit_scale(weights, features, outcomes):
+    # the score to probability scale that suits the starting weights best, it is kept fixed
+    # while tuning so the tuned weights stay in the same units
+    scales = np.geomspace(1e-4, 1, 200)
+    scores = features @ weights
+    predicted = 1 / (1 + np.exp(-np.outer(scores, scales)))
+    return scales[((predicted - outcomes[:, None]) ** 2).mean(axis=0).argmin()]
+
+
+def tune(features, outcomes, start=None, scale=None, generations=50, population=2000, elite=0.05, seed=0, log=None):
+    # cross-entropy method: sample a population around the mean, move the mean to the best few
+    rng = np.random.default_rng(seed)
+    start = start or DEFAULT_WEIGHTS
+    mean = np.array([start[name] for name in EVALUATION_FEATURES], dtype=np.float64)
+    scale = scale or fit_scale(mean, features, outcomes)
+    sigma = np.maximum(np.abs(mean), 1) / 2
+    n_elite = max(2, int(population * elite))
+
+    best = mean
+    best_loss = losses(mean, features, outcomes, scale)[0]
+    for generation in range(generations):
+        candidates = mean + sigma * rng.standard_normal((population, len(mean)))
+        candidates[0] = best
+        candidate_losses = losses(candidates, features, outcomes, scale)
+        order = np.argsort(candidate_losses)
+        if candidate_losses[order[0]] < best_loss:
+            best = candidates[order[0]]
+            best_loss = candidate_losses[order[0]]
+        elites = candidates[order[:n_elite]]
+        mean = elites.mean(axis=0)
+        sigma = elites.std(axis=0) + 1e-3
+        if log:
+            log(generation, best_loss)
+    return dict(zip(EVALUATION_FEATURES, (round(float(w), 3) for w in best))), scale
+
+
+def load_or_play(path, games, seed):
+    if path and os.path.exists(path):
+        data = np.load(path)
+        return data["features"], data["outcomes"]
+    features, outcomes = self_play(games, seed)
+    if path:
+        np.savez_compressed(path, features=features, outcomes=outcomes)
+    return features, outcomes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tune the evaluation weights on self-play positions")
+    parser.add_argument("--games", type=int, default=500, help="self-play games when there is no dataset yet")
+    parser.add_argument("--dataset", help=".npz file of positions, created by self-play if it does not exist")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--population", type=int, default=2000, help="weight sets scored per generation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=WEIGHTS_FILE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    features, outcomes = load_or_play(args.dataset, args.games, args.seed)
+    print(f"{len(features)} positions ({time.perf_counter() - start:.1f}s)")
+
+    # a tenth of the positions is held out to check the tuned weights on
+    order = np.random.default_rng(args.seed).permutation(len(features))
+    held_out, train = order[:len(order) // 10], order[len(order) // 10:]
+
+    start = time.perf_counter()
+    weights, scale = tune(features[train], outcomes[train], generations=args.generations,
+                         population=args.population, seed=args.seed,
+                         log=lambda generation, loss: print(f"generation {generation + 1}: loss {loss:.5f}"))
+    elapsed = time.perf_counter() - start
+    print(f"{args.generations * args.population / elapsed:.0f} weight sets/s")
+
+    for name, candidate in (("default", DEFAULT_WEIGHTS), ("tuned", weights)):
+        vector = np.array([candidate[feature] for feature in EVALUATION_FEATURES], dtype=np.float64)
+        print(f"{name:<8} held-out loss {losses(vector, features[held_out], outcomes[held_out], scale)[0]:.5f}")
+    save_weights(weights, args.output)
+    print(f"saved {weights} to {args.output}")
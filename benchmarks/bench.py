@@ -0,0 +1,457 @@
+import argparse
+import cProfile
+import gc
+import io
+import json
+import os
+import platform
+import pstats
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from game.kuba_game import KubaGame
+from game.perft import FIXTURES, fixture, perft
+
+BASELINE_FILE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+# --quick runs smaller workloads, some metrics depend on the size so they get their own baseline
+QUICK_BASELINE_FILE = os.path.join(REPO_ROOT, "benchmarks", "baseline_quick.json")
+POSITION_SEED = 1234
+GAME_SEED = 4321
+DEFAULT_TOLERANCE = 0.30
+# timed runs shorter than this are repeated in a loop, timer and scheduler noise would swamp them
+MIN_RUN_SECONDS = 0.05
+
+BENCHMARKS = []
+
+
+def benchmark(group):
+    def register(func):
+        BENCHMARKS.append((group, func))
+        return func
+    return register
+
+
+class Results:
+    def __init__(self):
+        self.values = {}
+
+    def add(self, name, value, unit, higher_is_better=True, gate=True):
+        # metrics with gate=False are reported but never fail the comparison
+        self.values[name] = {
+            "value": round(value, 4),
+            "unit": unit,
+            "higher_is_better": higher_is_better,
+            "gate": gate,
+        }
+        arrow = "↑" if higher_is_better else "↓"
+        print(f"  {name:<32} {value:>14.2f} {unit} {arrow}")
+
+
+def best_of(repeats, func, min_time=MIN_RUN_SECONDS):
+    # seconds per call of the fastest run, the one least disturbed by the rest of the machine.
+    # the first call warms up and decides how many calls a run needs to last min_time
+    start = time.perf_counter()
+    func()
+    loops = max(1, int(min_time / max(time.perf_counter() - start, 1e-9)) + 1)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def random_playout(game, rng, plies):
+    for _ in range(plies):
+        if game.winner:
+            break
+        moves = game.get_valid_moves()
+        if not moves:
+            break
+        game.make_move(*rng.choice(moves))
+    return game
+
+
+def fixed_positions(count=24, seed=POSITION_SEED):
+    # the same seed always produces the same set of mid-game positions
+    rng = random.Random(seed)
+    positions = [KubaGame()]
+    plies = [4, 8, 16, 24, 32, 48, 64, 96]
+    while len(positions) < count:
+        game = random_playout(KubaGame(), rng, plies[len(positions) % len(plies)])
+        if not game.winner:
+            positions.append(game)
+    return positions
+
+
+@benchmark("engine")
+def bench_move_generation(results, config):
+    positions = config["positions"]
+    generated = sum(len(game.get_valid_moves()) for game in positions)
+
+    def run():
+        for game in positions:
+            game.get_valid_moves()
+
+    elapsed = best_of(config["repeats"], run)
+    results.add("movegen_moves_per_sec", generated / elapsed, "moves/s")
+    results.add("movegen_positions_per_sec", len(positions) / elapsed, "positions/s")
+
+
+@benchmark("engine")
+def bench_perft(results, config):
+    depth = config["perft_depth"]
+    games = [fixture(name) for name in FIXTURES]
+    nodes = sum(perft(game, depth) for game in games)
+
+    def run():
+        for game in games:
+            perft(game, depth)
+
+    elapsed = best_of(config["repeats"], run)
+    results.add(f"perft_d{depth}_nodes_per_sec", nodes / elapsed, "nodes/s")
+
+
+@benchmark("engine")
+def bench_make_move(results, config):
+    work = [(game, move) for game in config["positions"] for move in game.get_valid_moves()]
+
+    def run():
+        copies = [(game.clone(), move) for game, move in work]
+        start = time.perf_counter()
+        for copy_, move in copies:
+            copy_.make_move(*move)
+        return time.perf_counter() - start
+
+    elapsed = min(run() for _ in range(config["repeats"]))
+    results.add("apply_moves_per_sec", len(work) / elapsed, "moves/s")
+
+
+@benchmark("engine")
+def bench_restore(results, config):
+    # positions are restored by cloning before every move, so cloning is the undo cost
+    positions = config["positions"]
+    loops = 20
+
+    def run():
+        for _ in range(loops):
+            for game in positions:
+                game.clone()
+
+    elapsed = best_of(config["repeats"], run)
+    results.add("clone_per_sec", loops * len(positions) / elapsed, "clones/s")
+
+
+@benchmark("engine")
+def bench_clone_memory(results, config):
+    positions = config["positions"]
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        clones = [game.clone() for game in positions]
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    results.add("clone_bytes", allocated / len(clones), "bytes", False)
+
+
+@benchmark("engine")
+def bench_notation(results, config):
+    positions = config["positions"]
+    notations = [game.to_notation() for game in positions]
+    packed = [game.pack() for game in positions]
+    loops = 20
+
+    def serialize():
+        for _ in range(loops):
+            for game in positions:
+                game.to_notation()
+                game.pack()
+
+    def parse():
+        for _ in range(loops):
+            for text in notations:
+                KubaGame.from_notation(text)
+
+    def unpack():
+        for _ in range(loops):
+            for number in packed:
+                KubaGame.from_packed(number)
+
+    count = loops * len(positions)
+    results.add("serialize_per_sec", count / best_of(config["repeats"], serialize), "positions/s")
+    results.add("parse_notation_per_sec", count / best_of(config["repeats"], parse), "positions/s")
+    results.add("unpack_per_sec", count / best_of(config["repeats"], unpack), "positions/s")
+
+
+@benchmark("engine")
+def bench_random_games(results, config):
+    rng = random.Random(GAME_SEED)
+    games = config["games"]
+    total_moves = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        game = random_playout(KubaGame(), rng, 10_000)
+        total_moves += game.moves
+    elapsed = time.perf_counter() - start
+    results.add("random_games_per_sec", games / elapsed, "games/s")
+    results.add("random_game_moves_per_sec", total_moves / elapsed, "moves/s")
+
+
+@benchmark("ai")
+def bench_search(results, config):
+    from ai.kuba_ai import KubaAI
+
+    positions = config["positions"][:config["search_positions"]]
+    for depth in range(1, config["max_depth"] + 1):
+        ai = KubaAI(epsilon=0, look_ahead_depth=depth)
+
+        def run():
+            for game in positions:
+                ai.get_best_move(game, depth)
+
+        # get_best_move() keeps no tables, every call searches the same nodes
+        run()
+        nodes = ai.nodes
+        collections = sum(stats["collections"] for stats in gc.get_stats())
+        ai.nodes = 0
+        elapsed = best_of(config["repeats"], run)
+        collections = sum(stats["collections"] for stats in gc.get_stats()) - collections
+        results.add(f"search_d{depth}_nodes_per_sec", nodes / elapsed, "nodes/s")
+        results.add(f"search_d{depth}_time_to_depth_ms", 1000 * elapsed / len(positions), "ms", False)
+        results.add(f"search_d{depth}_gc_per_1k_nodes", 1000 * collections / ai.nodes, "collections", False)
+
+
+@benchmark("ai")
+def bench_analysis(results, config):
+    from ai.kuba_ai import KubaAI
+
+    # stepping through one game with the same analyzer, as a hint feature would
+    rng = random.Random(GAME_SEED)
+    ai = KubaAI(epsilon=0)
+    game = KubaGame()
+    steps = 0
+    start = time.perf_counter()
+    while steps < config["analysis_steps"] and not game.winner:
+        ai.analyze(game, max_depth=3)
+        game.make_move(*rng.choice(game.get_valid_moves()))
+        steps += 1
+    elapsed = time.perf_counter() - start
+    results.add("analysis_step_d3_ms", 1000 * elapsed / steps, "ms", False)
+
+
+@benchmark("ai")
+def bench_evaluate(results, config):
+    from ai.kuba_ai import KubaAI
+
+    ai = KubaAI()
+    positions = config["positions"]
+    loops = 50
+
+    def run():
+        for _ in range(loops):
+            for game in positions:
+                ai.evaluate_state(game)
+
+    elapsed = best_of(config["repeats"], run)
+    results.add("evaluate_per_sec", loops * len(positions) / elapsed, "evals/s")
+
+
+@benchmark("ai")
+def bench_sessions(results, config):
+    from ai.sessions import SessionManager, simulate
+
+    # many games hosted side by side, what one more open game costs and how fast the bots answer
+    manager = SessionManager(seed=GAME_SEED)
+    manager.open()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        sessions = [manager.open() for _ in range(config["sessions"])]
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    results.add("session_bytes", allocated / len(sessions), "bytes", False)
+
+    start = time.perf_counter()
+    _, replies = simulate(manager, config["sessions"], 3, seed=GAME_SEED)
+    results.add("session_replies_per_sec", replies / (time.perf_counter() - start), "replies/s")
+
+
+@benchmark("ai")
+def bench_model_load(results, config):
+    from ai.kuba_ai import KubaAI, AI_MODEL_FILE
+
+    def run():
+        KubaAI().load_model(AI_MODEL_FILE)
+
+    # a load takes a millisecond or two and swings by half between otherwise equal runs, so
+    # it is reported but does not gate
+    elapsed = best_of(config["repeats"], run)
+    results.add("model_load_ms", 1000 * elapsed, "ms", False, gate=False)
+
+
+@benchmark("ui")
+def bench_frame_time(results, config):
+    from ui.headless import HeadlessRenderer, STAGES
+
+    # every other position has a marble selected so the valid moves get drawn
+    games = []
+    for i, game in enumerate(config["positions"]):
+        game = game.clone()
+        moves = game.get_valid_moves()
+        if i % 2 and moves:
+            game.selected = moves[0][0]
+        games.append(game)
+
+    renderer = HeadlessRenderer()
+    try:
+        best = None
+        for _ in range(config["repeats"]):
+            totals = dict.fromkeys(STAGES, 0.0)
+            for game in games:
+                for stage, seconds in renderer.render(game).items():
+                    totals[stage] += seconds
+            if best is None or sum(totals.values()) < sum(best.values()):
+                best = totals
+    finally:
+        renderer.close()
+
+    results.add("ui_frame_ms", 1000 * sum(best.values()) / len(games), "ms", False)
+    for stage in STAGES:
+        results.add(f"ui_{stage}_ms", 1000 * best[stage] / len(games), "ms", False, gate=False)
+
+
+def run_benchmarks(groups=None, quick=False):
+    config = {
+        "positions": fixed_positions(24),
+        "repeats": 3 if quick else 5,
+        "games": 10 if quick else 50,
+        "search_positions": 4,
+        "max_depth": 2,
+        "perft_depth": 3,
+        "analysis_steps": 10 if quick else 30,
+        "sessions": 100 if quick else 500,
+    }
+    results = Results()
+    skipped = {}
+    for group, func in BENCHMARKS:
+        if groups and group not in groups:
+            continue
+        print(f"[{group}] {func.__name__}")
+        try:
+            func(results, config)
+        except ImportError as e:
+            # optional groups need pygame / the AI dependencies
+            skipped[func.__name__] = str(e)
+            print(f"  skipped: {e}")
+    return results.values, skipped
+
+
+def check_workload(meta, quick):
+    # results of a different workload size are not comparable
+    if bool(meta.get("quick")) != quick:
+        return f"the baseline was recorded {'with' if meta.get('quick') else 'without'} --quick"
+    return None
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for name, base in baseline.items():
+        if name not in results:
+            print(f"  {name:<32} missing from this run")
+            continue
+        value = results[name]["value"]
+        if not value or not base["value"]:
+            continue
+        if base["higher_is_better"]:
+            change = value / base["value"] - 1
+        else:
+            change = base["value"] / value - 1
+        status = "ok"
+        if not base.get("gate", True):
+            status = "info"
+        elif change < -tolerance:
+            status = "REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<32} {base['value']:>14.2f} -> {value:>14.2f} ({change:+.1%}) {status}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kuba engine, AI and UI benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for CI")
+    parser.add_argument("--group", action="append", choices=["engine", "ai", "ui"],
+                        help="only run the given benchmark group (repeatable)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="baseline JSON to compare against "
+                        "(default: benchmarks/baseline.json, or baseline_quick.json with --quick)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed relative slowdown before a result counts as a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with these results")
+    parser.add_argument("--profile", action="store_true", help="print the top functions by cumulative time")
+    args = parser.parse_args(argv)
+
+    os.chdir(REPO_ROOT)
+    if not args.baseline:
+        args.baseline = QUICK_BASELINE_FILE if args.quick else BASELINE_FILE
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    results, skipped = run_benchmarks(args.group, args.quick)
+    if profiler:
+        profiler.disable()
+        s = io.StringIO()
+        pstats.Stats(profiler, stream=s).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(15)
+        print(s.getvalue())
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatch = check_workload(baseline.get("meta", {}), args.quick)
+    if mismatch:
+        print(f"Not comparing against {args.baseline}: {mismatch}.")
+        return 2
+    baseline = baseline["results"]
+    print(f"\nComparing against {args.baseline} (tolerance {args.tolerance:.0%})")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} performance regression(s): {', '.join(regressions)}")
+        return 1
+    print("\nNo performance regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
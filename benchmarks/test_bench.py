@@ -0,0 +1,38 @@
+import unittest
+from benchmarks.bench import check_workload, compare, fixed_positions
+
+def result(value, higher_is_better=True):
+    return {"value": value, "unit": "x", "higher_is_better": higher_is_better}
+
+class TestBench(unittest.TestCase):
+
+    def test_fixed_positions_are_reproducible(self):
+        first = [game.board.get_all_marbles() for game in fixed_positions(8)]
+        second = [game.board.get_all_marbles() for game in fixed_positions(8)]
+        self.assertEqual(first, second)
+
+    def test_compare_flags_slowdowns_beyond_tolerance(self):
+        baseline = {
+            "throughput": result(100.0),
+            "latency_ms": result(10.0, higher_is_better=False),
+            "steady": result(50.0),
+        }
+        results = {
+            "throughput": result(60.0),
+            "latency_ms": result(20.0, higher_is_better=False),
+            "steady": result(45.0),
+        }
+        self.assertEqual(compare(results, baseline, tolerance=0.3), ["throughput", "latency_ms"])
+
+    def test_ungated_metrics_never_regress(self):
+        baseline = {"stage_ms": dict(result(1.0, higher_is_better=False), gate=False)}
+        self.assertEqual(compare({"stage_ms": result(5.0, higher_is_better=False)}, baseline), [])
+
+    def test_quick_runs_need_a_quick_baseline(self):
+        self.assertIsNone(check_workload({"quick": True}, True))
+        self.assertIsNone(check_workload({"quick": False}, False))
+        self.assertIsNotNone(check_workload({"quick": False}, True))
+        self.assertIsNotNone(check_workload({}, True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 from enum import Enum
-import copy
+from itertools import chain
 from typing import List, Tuple, Optional
 
 class MarbleColor(Enum):
@@ -21,17 +21,91 @@ class Direction(Enum):
     DOWN = (0, 1)
 
     def opposite(self):
-        opposites = {
-            Direction.LEFT: Direction.RIGHT,
-            Direction.RIGHT: Direction.LEFT,
-            Direction.UP: Direction.DOWN,
-            Direction.DOWN: Direction.UP
-        }
-        return opposites[self]
+        return _OPPOSITES[self]
+
+DIRECTIONS = [Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN]
+_OPPOSITES = {
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP
+}
+_DIRECTION_INDEX = {direction: i for i, direction in enumerate(DIRECTIONS)}
+
+# Moves packed into ints: (row * 7 + col) * 4 + direction index. MOVES holds the one
+# shared ((row, col), Direction) tuple for every move so nothing is allocated per move.
+MOVES = [((row, col), direction) for row in range(7) for col in range(7) for direction in DIRECTIONS]
+
+def encode_move(coordinates: Tuple[int, int], direction: Direction) -> int:
+    return (coordinates[0] * 7 + coordinates[1]) * 4 + _DIRECTION_INDEX[direction]
+
+def decode_move(move: int) -> Tuple[Tuple[int, int], Direction]:
+    return MOVES[move]
+
+# every line a marble can leave the board along: the direction and the cells from the edge it
+# leaves by inwards. Only the marble at the inner end of the row of marbles touching that edge
+# can push the row, so each line has at most one move pushing a marble off
+def _exit_line(direction, line):
+    dx, dy = direction.value
+    cells = [(row, col) for row in range(7) for col in range(7) if (row if dx else col) == line]
+    # the cell on the edge in the direction first
+    return sorted(cells, key=lambda cell: -(cell[1] * dx + cell[0] * dy))
+
+_EXIT_LINES = [(direction, _exit_line(direction, line)) for direction in DIRECTIONS for line in range(7)]
+
+# bit row * 7 + col of a 49 bit mask is the cell (row, col), _CROSS_MASKS[cell] holds its row and column
+_CROSS_MASKS = [sum(1 << (r * 7 + c) for r in range(7) for c in range(7) if r == row or c == col)
+                for row in range(7) for col in range(7)]
+
+# Position notation, rows top to bottom separated by '/', digits count empty cells:
+#   <rows> <side to move> <white captures> <black captures> <last move> <moves>
+# the last move is written as row, col, direction and the number of marbles it pushed
+# (e.g. 01R2) and is needed for the KO rule, '-' when there is none.
+START_NOTATION = "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 0 0 - 0"
+
+# Packed layout, least significant bits first: 49 cells of 2 bits, 1 bit side to move,
+# 3 bits captures per player, 12 bits last move (present flag, row, col, direction, length - 1).
+# The move counter is not part of it so equal positions pack to equal integers.
+_CELL_CODES = {None: 0, 'W': 1, 'B': 2, 'R': 3}
+_DIRECTION_LETTERS = {Direction.LEFT: 'L', Direction.RIGHT: 'R', Direction.UP: 'U', Direction.DOWN: 'D'}
+_LETTER_DIRECTIONS = {letter: direction for direction, letter in _DIRECTION_LETTERS.items()}
+_SIDE_SHIFT = 98
+_CAPTURE_SHIFT = 99
+_LAST_MOVE_SHIFT = 105
+
+def format_move(coordinates: Tuple[int, int], direction: Direction) -> str:
+    # row, col and direction letter, e.g. "06L"
+    return f"{coordinates[0]}{coordinates[1]}{_DIRECTION_LETTERS[direction]}"
+
+def parse_move(text: str) -> Tuple[Tuple[int, int], Direction]:
+    if len(text) != 3 or text[0] not in '0123456' or text[1] not in '0123456' or text[2] not in _LETTER_DIRECTIONS:
+        raise ValueError(f"Invalid move {text!r}")
+    return MOVES[encode_move((int(text[0]), int(text[1])), _LETTER_DIRECTIONS[text[2]])]
 
 class Marble:
-    def __init__(self, color: MarbleColor):
-        self.color = color
+    # marbles are immutable flyweights, Marble(color) always returns the same instance
+    __slots__ = ('color',)
+    _shared = {}
+
+    def __new__(cls, color: MarbleColor):
+        marble = cls._shared.get(color)
+        if marble is None:
+            marble = object.__new__(cls)
+            object.__setattr__(marble, 'color', color)
+            cls._shared[color] = marble
+        return marble
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Marble is immutable")
+
+    def __reduce__(self):
+        return (Marble, (self.color,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         color = PrintColor.END
@@ -45,10 +119,21 @@ class Marble:
 
         return color.value + self.color.value + PrintColor.END.value
 
+# the shared marble for every color and color letter
+_COLOR_MARBLES = [(color, Marble(color)) for color in MarbleColor]
+_LETTER_MARBLES = {color.value: marble for color, marble in _COLOR_MARBLES}
+
 class Board:
+    # win detection and get_game_state() read counts instead of scanning grid. set_marble and
+    # push_marbles keep them up to date, anything that writes to grid directly must call
+    # update_counts() afterwards or the counts, and the winner, are wrong
+    __slots__ = ('game', 'grid', 'counts')
+
     def __init__(self, game):
         self.game = game
         self.grid: List[List[Optional[Marble]]] = [[None for _ in range(7)] for _ in range(7)]
+        # marbles per color, see above
+        self.counts = {color: 0 for color in MarbleColor}
         self._initialize_board()
 
     def __repr__(self):
@@ -74,11 +159,14 @@ class Board:
             ['B', 'B', '.', '.', '.', 'W', 'W']
         ]
 
-        for row in range(7):
-            for col in range(7):
-                color = initial_config[row][col]
-                if color != '.':
-                    self.grid[row][col] = Marble(MarbleColor(color))
+        self.grid = [[_LETTER_MARBLES.get(color) for color in row] for row in initial_config]
+        self.update_counts()
+
+    def update_counts(self):
+        # recounts grid, required after writing to it directly. Marbles are shared so list.count
+        # finds them
+        cells = list(chain.from_iterable(self.grid))
+        self.counts = {color: cells.count(marble) for color, marble in _COLOR_MARBLES}
 
     def get_marble(self, coordinates: Tuple[int, int]) -> Optional[Marble]:
         row, col = coordinates
@@ -86,6 +174,11 @@ class Board:
 
     def set_marble(self, coordinates: Tuple[int, int], marble: Optional[Marble]):
         row, col = coordinates
+        old_marble = self.grid[row][col]
+        if old_marble is not None:
+            self.counts[old_marble.color] -= 1
+        if marble is not None:
+            self.counts[marble.color] += 1
         self.grid[row][col] = marble
 
     def get_move(self, coordinates: Tuple[int, int], direction: Direction, check=False):
@@ -96,24 +189,22 @@ class Board:
             return []
 
         # check if marble can be pushed in this direction
+        grid = self.grid
         row, col = coordinates
-        opposite_direction = direction.opposite()
-        dx, dy = opposite_direction.value
-        opposite_row, opposite_col = row + dy, col + dx
+        dx, dy = direction.value
+        opposite_row, opposite_col = row - dy, col - dx
 
         # check if the opposite direction is empty or out of bounds
         if 0 <= opposite_row < 7 and 0 <= opposite_col < 7:
-            if self.get_marble((opposite_row, opposite_col)) is not None:
+            if grid[opposite_row][opposite_col] is not None:
                 if not check:
                     self.game._alert("Can't push")
                 return []
 
-        dx, dy = direction.value
         continuous_marbles = []
 
         while 0 <= row < 7 and 0 <= col < 7:
-            marble = self.get_marble((row, col))
-            if marble is None:
+            if grid[row][col] is None:
                 break
             continuous_marbles.append((row, col))
             row += dy
@@ -123,15 +214,18 @@ class Board:
 
     def push_marbles(self, marbles: List[Tuple[int, int]], direction: Direction):
         pushed_off_marbles = []
+        grid = self.grid
         dx, dy = direction.value
         for i in range(len(marbles) - 1, -1 , -1):
-            old_pos = marbles[i]
-            new_pos = (old_pos[0] + dy, old_pos[1] + dx)
-            if 0 <= new_pos[0] < 7 and 0 <= new_pos[1] < 7:
-                self.set_marble(new_pos, self.get_marble(old_pos))
+            old_row, old_col = marbles[i]
+            new_row, new_col = old_row + dy, old_col + dx
+            if 0 <= new_row < 7 and 0 <= new_col < 7:
+                grid[new_row][new_col] = grid[old_row][old_col]
             else:
-                pushed_off_marbles.append(self.get_marble(old_pos))
-            self.set_marble(old_pos, None)
+                marble = grid[old_row][old_col]
+                pushed_off_marbles.append(marble)
+                self.counts[marble.color] -= 1
+            grid[old_row][old_col] = None
 
         return pushed_off_marbles
 
@@ -145,11 +239,12 @@ class Board:
                     if marble is not None and marble.color == color]
 
 class Player:
+    __slots__ = ('name', 'color', 'captured_red')
+
     def __init__(self, name: str, color: MarbleColor):
         self.name = name
         self.color = color
         self.captured_red = 0
-        self.previous_move: Optional[Tuple[Tuple[int, int], Direction, List[Tuple[int, int]]]] = None
 
     def __repr__(self):
         return f"{self.name} ({self.color.value})"
@@ -157,7 +252,16 @@ class Player:
     def capture_red(self):
         self.captured_red += 1
 
+    def clone(self):
+        player = Player.__new__(Player)
+        player.name = self.name
+        player.color = self.color
+        player.captured_red = self.captured_red
+        return player
+
 class Alert:
+    __slots__ = ('message',)
+
     def __init__(self, message: str):
         self.message = message
     
@@ -165,6 +269,9 @@ class Alert:
         return PrintColor.RED.value + self.message + PrintColor.END.value
 
 class KubaGame:
+    __slots__ = ('players', 'board', 'current_player_index', 'winner', 'alert', 'moves', 'selected', 'debug',
+                 'last_move', 'ko_cells', 'ko_direction', 'ko_cross')
+
     def __init__(self, debug=False):
         self.players = [
             Player("You", MarbleColor("W")),
@@ -176,6 +283,13 @@ class KubaGame:
         self.alert = None
         self.moves = 0
 
+        # the last move (an int, see encode_move) and what the KO rule forbids after it:
+        # pushing in ko_direction from a cell in ko_cross over any of the ko_cells
+        self.last_move: Optional[int] = None
+        self.ko_cells = 0
+        self.ko_direction: Optional[Direction] = None
+        self.ko_cross = 0
+
         self.selected = None
 
         self.debug=debug
@@ -228,21 +342,22 @@ class KubaGame:
         if not affected_positions:
             return False
 
-        # convert positions into marbles
-        affected_marbles = [self.board.get_marble(c) for c in affected_positions]
+        grid = self.board.grid
+        color = self.current_player.color
 
         # check if player is moving their own marble
-        if affected_marbles[0].color != self.current_player.color:
+        first_marble = grid[affected_positions[0][0]][affected_positions[0][1]]
+        if first_marble.color != color:
             if not check:
-                self._alert(f"{self.current_player} can't move {affected_marbles[0]}!")
+                self._alert(f"{self.current_player} can't move {first_marble}!")
             return False
 
         # check if player is pushing off their own marble
-        last_marble = affected_marbles[-1]
         last_row, last_col = affected_positions[-1]
+        last_marble = grid[last_row][last_col]
         new_pos = (last_row + direction.value[1], last_col + direction.value[0])
         if new_pos[0] < 0 or new_pos[0] >= 7 or new_pos[1] < 0 or new_pos[1] >= 7:
-            if last_marble.color == self.current_player.color:
+            if last_marble.color == color:
                 if not check:
                     self._alert(f"{self.current_player} can't push off their own marble!")
                 return False
@@ -268,13 +383,13 @@ class KubaGame:
                 self.current_player.capture_red()
 
 
-        self.current_player.previous_move = (coordinates, direction, affected_positions)
+        self._set_last_move(coordinates, direction, affected_positions)
 
         # check for win conditions
         if self.current_player.captured_red >= 7:
             self.winner = self.current_player
             self._alert(f"{self.winner} wins by capturing 7 red marbles!")
-        elif not self.board.get_all_marbles(self.opponent.color):
+        elif not self.board.counts[self.opponent.color]:
             self.winner = self.current_player
             self._alert(f"{self.winner} wins by eliminating all opponent's marbles!")
 
@@ -283,78 +398,267 @@ class KubaGame:
             self.current_player_index = (self.current_player_index + 1) % 2
 
         # if after switching there are no moves declare a winner
-        if not self.winner and not self.get_valid_moves():
+        if not self.winner and not self.has_valid_move():
             self.winner = self.opponent
             self._alert(f"{self.winner} wins since opponent has no moves")
 
         return True
 
     def _violates_ko_rule(self, coordinate: Tuple[int, int], direction: Direction, affected_positions: List[Tuple[int, int]]):
-        if not self.opponent.previous_move:
+        # the current move undoes the previous move if it pushes back along the same row or column
+        # and moves the same group of marbles
+        if direction is not self.ko_direction:
             return False
-
-        prev_coord, prev_direction, prev_affected = self.opponent.previous_move
-
-        # check if the moves interact with the same group of marbles
-        if not set(affected_positions).intersection(set(prev_affected)):
+        row, col = coordinate
+        if not self.ko_cross >> (row * 7 + col) & 1:
             return False
-
-        # check if the current move undoes the previous move
-        if direction == prev_direction.opposite():
-            # if the marbles are in the same row or column and moving in opposite directions
-            if (coordinate[0] == prev_coord[0] or coordinate[1] == prev_coord[1]):
+        ko_cells = self.ko_cells
+        for r, c in affected_positions:
+            if ko_cells >> (r * 7 + c) & 1:
                 return True
-
         return False
 
+    def _set_last_move(self, coordinates: Tuple[int, int], direction: Direction, affected_positions):
+        row, col = coordinates
+        self.last_move = encode_move(coordinates, direction)
+        self.ko_cells = 0
+        for r, c in affected_positions:
+            self.ko_cells |= 1 << (r * 7 + c)
+        self.ko_direction = direction.opposite()
+        self.ko_cross = _CROSS_MASKS[row * 7 + col]
+
     def get_valid_moves(self, cord=None):
-        cords = [cord]
         if not cord:
-            cords = self.board.get_all_marbles(self.current_player.color)
+            return [MOVES[move] for move in self.get_valid_move_ids()]
         moves = []
-        for c in cords:
-            for direction in [Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN]:
-                if self.make_move(c, direction, True):
-                    moves.append((c, direction))
+        for direction in DIRECTIONS:
+            if self.make_move(cord, direction, True):
+                moves.append((cord, direction))
         return moves
 
+    def get_valid_move_ids(self) -> List[int]:
+        moves = []
+        for row, col in self.board.get_all_marbles(self.current_player.color):
+            base = (row * 7 + col) * 4
+            for move in range(base, base + 4):
+                coordinates, direction = MOVES[move]
+                if self.make_move(coordinates, direction, True):
+                    moves.append(move)
+        return moves
+
+    def get_capture_move_ids(self) -> List[int]:
+        # the legal moves that push a marble off the board, without trying every move
+        grid = self.board.grid
+        color = self.current_player.color
+        moves = []
+        for direction, cells in _EXIT_LINES:
+            pusher = None
+            for row, col in cells:
+                if grid[row][col] is None:
+                    break
+                pusher = (row, col)
+            if pusher is not None and grid[pusher[0]][pusher[1]].color is color \
+                    and self.make_move(pusher, direction, True):
+                moves.append(encode_move(pusher, direction))
+        return moves
+
+    def has_valid_move(self) -> bool:
+        # like get_valid_moves but stops at the first legal move
+        color = self.current_player.color
+        for row, marbles in enumerate(self.board.grid):
+            for col, marble in enumerate(marbles):
+                if marble is not None and marble.color is color:
+                    for direction in DIRECTIONS:
+                        if self.make_move((row, col), direction, True):
+                            return True
+        return False
+
+    def make_move_id(self, move: int, check=False) -> bool:
+        return self.make_move(*MOVES[move], check)
+
     def get_game_state(self):
-        white = len(self.board.get_all_marbles(MarbleColor.WHITE))
-        black = len(self.board.get_all_marbles(MarbleColor.BLACK))
-        red = len(self.board.get_all_marbles(MarbleColor.RED))
+        counts = self.board.counts
         return {
-            MarbleColor.WHITE.value: white,
-            MarbleColor.BLACK.value: black,
-            MarbleColor.RED.value: red
+            MarbleColor.WHITE.value: counts[MarbleColor.WHITE],
+            MarbleColor.BLACK.value: counts[MarbleColor.BLACK],
+            MarbleColor.RED.value: counts[MarbleColor.RED]
         }
 
     def clone(self):
-        # Create a new instance of KubaGame
-        cloned_game = KubaGame()
-
-        # Copy the board state
-        cloned_game.board = Board(cloned_game)
-        for row in range(7):
-            for col in range(7):
-                cloned_game.board.grid[row][col] = copy.deepcopy(self.board.grid[row][col])
-
-        # Copy players
-        cloned_game.players = [
-            Player(player.name, player.color) for player in self.players
-        ]
-        for original_player, cloned_player in zip(self.players, cloned_game.players):
-            cloned_player.captured_red = original_player.captured_red
-            cloned_player.previous_move = copy.deepcopy(original_player.previous_move)
-
-        # Copy game state
+        # marbles are shared, so copying the rows is enough
+        cloned_game = KubaGame.__new__(KubaGame)
+        board = Board.__new__(Board)
+        board.game = cloned_game
+        board.grid = [row[:] for row in self.board.grid]
+        board.counts = self.board.counts.copy()
+        cloned_game.board = board
+
+        cloned_game.players = [player.clone() for player in self.players]
         cloned_game.current_player_index = self.current_player_index
-        cloned_game.winner = self.winner
-        cloned_game.alert = copy.deepcopy(self.alert)
+        cloned_game.winner = None
+        if self.winner:
+            cloned_game.winner = cloned_game.players[self.players.index(self.winner)]
+        cloned_game.alert = self.alert
         cloned_game.moves = self.moves
         cloned_game.selected = self.selected
+        cloned_game.debug = False
+        cloned_game.last_move = self.last_move
+        cloned_game.ko_cells = self.ko_cells
+        cloned_game.ko_direction = self.ko_direction
+        cloned_game.ko_cross = self.ko_cross
 
         return cloned_game
 
+    def _set_position(self, cells, current_player_index, captures, last_move, moves):
+        # pack() keeps 3 bits per capture count
+        for captured in captures:
+            if not 0 <= captured <= 7:
+                raise ValueError(f"Captured red marbles must be between 0 and 7, got {captured}")
+        # rows are filled in place, a game can be loaded over and over without allocating a board
+        for row, marbles in enumerate(self.board.grid):
+            marbles[:] = [_LETTER_MARBLES.get(color) for color in cells[row * 7:row * 7 + 7]]
+        self.board.update_counts()
+
+        self.current_player_index = current_player_index
+        for player, captured in zip(self.players, captures):
+            player.captured_red = captured
+        self.moves = moves
+        self.winner = None
+        self.alert = None
+        self.selected = None
+
+        # a loaded position can already be decided
+        for player in self.players:
+            if player.captured_red >= 7:
+                self.winner = player
+                break
+        else:
+            for player, other in zip(self.players, self.players[::-1]):
+                if not self.board.counts[other.color]:
+                    self.winner = player
+                    break
+
+        self.last_move = None
+        self.ko_cells = 0
+        self.ko_direction = None
+        self.ko_cross = 0
+        if last_move:
+            (row, col), direction, length = last_move
+            dx, dy = direction.value
+            affected = [(row + dy * i, col + dx * i) for i in range(length)]
+            if not all(0 <= r < 7 and 0 <= c < 7 for r, c in affected) or not length:
+                raise ValueError(f"Last move {last_move} is off the board")
+            self._set_last_move((row, col), direction, affected)
+
+        if not self.winner and not self.has_valid_move():
+            self.winner = self.opponent
+
+    def to_notation(self) -> str:
+        rows = []
+        for row in self.board.grid:
+            text = ""
+            empty = 0
+            for marble in row:
+                if marble is None:
+                    empty += 1
+                    continue
+                if empty:
+                    text += str(empty)
+                    empty = 0
+                text += marble.color.value
+            if empty:
+                text += str(empty)
+            rows.append(text)
+
+        last_move = "-"
+        if self.last_move is not None:
+            (row, col), direction = MOVES[self.last_move]
+            last_move = f"{row}{col}{_DIRECTION_LETTERS[direction]}{self.ko_cells.bit_count()}"
+
+        return (f"{'/'.join(rows)} {self.current_player.color.value} "
+                f"{self.players[0].captured_red} {self.players[1].captured_red} {last_move} {self.moves}")
+
+    @classmethod
+    def from_notation(cls, notation: str, debug=False) -> 'KubaGame':
+        fields = notation.split()
+        if len(fields) not in (5, 6):
+            raise ValueError(f"Invalid notation: {notation!r}")
+        board, side, white_captures, black_captures, last_move = fields[:5]
+
+        cells = []
+        rows = board.split('/')
+        if len(rows) != 7:
+            raise ValueError(f"Invalid notation, expected 7 rows: {notation!r}")
+        for text in rows:
+            count = len(cells)
+            for char in text:
+                if char in 'WBR':
+                    cells.append(char)
+                elif char in '1234567':
+                    cells.extend([None] * int(char))
+                else:
+                    raise ValueError(f"Invalid notation, unknown cell {char!r}: {notation!r}")
+            if len(cells) - count != 7:
+                raise ValueError(f"Invalid notation, expected 7 cells in row {text!r}")
+
+        if side not in ('W', 'B'):
+            raise ValueError(f"Invalid notation, unknown side to move {side!r}")
+
+        move = None
+        if last_move != '-':
+            if (len(last_move) != 4 or last_move[2] not in _LETTER_DIRECTIONS
+                    or not last_move[0].isdigit() or not last_move[1].isdigit() or not last_move[3].isdigit()):
+                raise ValueError(f"Invalid notation, bad last move {last_move!r}")
+            move = ((int(last_move[0]), int(last_move[1])), _LETTER_DIRECTIONS[last_move[2]], int(last_move[3]))
+
+        game = cls(debug)
+        game._set_position(cells, 0 if side == 'W' else 1,
+                           (int(white_captures), int(black_captures)),
+                           move, int(fields[5]) if len(fields) == 6 else 0)
+        return game
+
+    def pack(self) -> int:
+        packed = 0
+        shift = 0
+        for row in self.board.grid:
+            for marble in row:
+                if marble is not None:
+                    packed |= _CELL_CODES[marble.color.value] << shift
+                shift += 2
+
+        packed |= self.current_player_index << _SIDE_SHIFT
+        packed |= self.players[0].captured_red << _CAPTURE_SHIFT
+        packed |= self.players[1].captured_red << (_CAPTURE_SHIFT + 3)
+
+        # the last move carries the KO state, so pack() can key caches of positions
+        if self.last_move is not None:
+            cell, direction = divmod(self.last_move, 4)
+            row, col = divmod(cell, 7)
+            move = 1 | row << 1 | col << 4 | direction << 7 | (self.ko_cells.bit_count() - 1) << 9
+            packed |= move << _LAST_MOVE_SHIFT
+        return packed
+
+    @classmethod
+    def from_packed(cls, packed: int, debug=False) -> 'KubaGame':
+        game = cls(debug)
+        game.unpack(packed)
+        return game
+
+    def unpack(self, packed: int, moves=0):
+        # loads a pack()ed position into this game, pack() leaves out the move counter
+        codes = (None, 'W', 'B', 'R')
+        cells = [codes[(packed >> (2 * i)) & 3] for i in range(49)]
+
+        move = None
+        last_move = packed >> _LAST_MOVE_SHIFT
+        if last_move & 1:
+            move = (((last_move >> 1) & 7, (last_move >> 4) & 7),
+                    DIRECTIONS[(last_move >> 7) & 3], ((last_move >> 9) & 7) + 1)
+
+        self._set_position(cells, (packed >> _SIDE_SHIFT) & 1,
+                           ((packed >> _CAPTURE_SHIFT) & 7, (packed >> (_CAPTURE_SHIFT + 3)) & 7),
+                           move, moves)
+
 
 if __name__ == "__main__":
     game = KubaGame()
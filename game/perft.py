@@ -0,0 +1,105 @@
+import argparse
+import time
+
+from game.kuba_game import KubaGame, Direction
+
+L, R, U, D = Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN
+
+# Positions are reached by replaying moves from the start so they only rely on
+# make_move, which is what every engine being checked has to agree on.
+FIXTURES = {
+    "start": [],
+    # Black to move, (0, 5) LEFT would undo White's push and is ko-forbidden
+    "ko": [((0, 0), R), ((0, 6), L), ((0, 1), R)],
+    # White to move, (1, 3) DOWN captures a red marble
+    "capture": [((0, 0), R), ((0, 6), D), ((0, 1), R), ((1, 6), D), ((0, 3), D), ((2, 6), D)],
+    # White to move, (1, 1) RIGHT pushes a black marble off the right edge
+    "edge_push": [((6, 6), L), ((5, 0), R), ((6, 4), R), ((5, 2), U), ((1, 0), R), ((6, 0), U)],
+}
+
+# Leaf counts produced by the original KubaGame implementation, depths 1 to 4
+EXPECTED = {
+    "start": [8, 64, 636, 6292],
+    "ko": [9, 109, 1192, 15169],
+    "capture": [14, 168, 2347, 30300],
+    "edge_push": [9, 105, 1081, 12833],
+}
+
+
+def fixture(name):
+    game = KubaGame()
+    for coordinates, direction in FIXTURES[name]:
+        if not game.make_move(coordinates, direction):
+            raise ValueError(f"Fixture {name} has an illegal move: {coordinates} {direction}")
+    return game
+
+
+def perft(game, depth):
+    if depth == 0:
+        return 1
+    if game.winner:
+        return 0
+
+    moves = game.get_valid_moves()
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        new_game = game.clone()
+        new_game.make_move(*move)
+        nodes += perft(new_game, depth - 1)
+    return nodes
+
+
+def divide(game, depth):
+    # leaf counts per root move, the first place to look when two engines disagree
+    counts = {}
+    for move in game.get_valid_moves():
+        new_game = game.clone()
+        new_game.make_move(*move)
+        counts[move] = perft(new_game, depth - 1)
+    return counts
+
+
+def check_engine(candidate_perft, depth, names=None, reference_perft=perft):
+    # candidate_perft(fixture_name, depth) is compared with the KubaGame reference
+    mismatches = {}
+    for name in names or FIXTURES:
+        expected = reference_perft(fixture(name), depth)
+        actual = candidate_perft(name, depth)
+        if actual != expected:
+            mismatches[name] = (expected, actual)
+    return mismatches
+
+
+def run(depth, names=None):
+    total_nodes = 0
+    total_time = 0.0
+    for name in names or FIXTURES:
+        game = fixture(name)
+        for d in range(1, depth + 1):
+            start = time.perf_counter()
+            nodes = perft(game, d)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} depth {d}: {nodes:>10} nodes {elapsed:8.3f}s {nodes / elapsed if elapsed else 0:>12.0f} nodes/s")
+            total_nodes += nodes
+            total_time += elapsed
+    print(f"total: {total_nodes} nodes in {total_time:.3f}s ({total_nodes / total_time:.0f} nodes/s)")
+    return total_nodes, total_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count move-generation leaf nodes from fixed positions")
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fixture", action="append", choices=list(FIXTURES))
+    parser.add_argument("--divide", action="store_true", help="print leaf counts for every root move")
+    args = parser.parse_args()
+
+    if args.divide:
+        for name in args.fixture or FIXTURES:
+            print(name)
+            for (coordinates, direction), count in divide(fixture(name), args.depth).items():
+                print(f"  {coordinates} {direction.name:<5} {count}")
+    else:
+        run(args.depth, args.fixture)
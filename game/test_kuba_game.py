@@ -1,5 +1,6 @@
+import random
 import unittest
-from kuba_game import KubaGame, MarbleColor, Direction
+from kuba_game import KubaGame, Marble, MarbleColor, Direction, START_NOTATION, encode_move, decode_move
 
 class TestKubaGame(unittest.TestCase):
 
@@ -56,13 +57,114 @@ class TestKubaGame(unittest.TestCase):
         self.assertEqual(self.game.winner, self.game.players[0])
 
     def test_win_by_eliminating_opponent_marbles(self):
-        # This test would also be quite long, so we'll simulate it
-        for i in range(7):
-            for j in range(7):
-                if self.game.board.grid[i][j] and self.game.board.grid[i][j].color == MarbleColor.BLACK:
-                    self.game.board.grid[i][j] = None
-        self.game.make_move((0, 0), Direction.RIGHT)  # Any valid move
+        # Black's last marble sits on the edge next to a white one
+        self.game = KubaGame.from_notation("5WB/WW1R3/2RRR2/1RRRRR1/2RRR2/3R1WW/5WW W 0 0 - 0")
+        self.assertTrue(self.game.make_move((0, 5), Direction.RIGHT))
         self.assertEqual(self.game.winner, self.game.players[0])
 
+    def test_marbles_are_shared(self):
+        self.assertIs(Marble(MarbleColor.RED), Marble(MarbleColor.RED))
+        self.assertIs(self.game.board.get_marble((0, 0)), self.game.board.get_marble((6, 6)))
+        with self.assertRaises(AttributeError):
+            self.game.board.get_marble((0, 0)).color = MarbleColor.BLACK
+
+    def test_clone_is_independent(self):
+        clone = self.game.clone()
+        self.assertTrue(clone.make_move((0, 0), Direction.RIGHT))
+        self.assertIsNone(self.game.board.get_marble((0, 2)))
+        self.assertIsNone(self.game.last_move)
+        self.assertEqual(self.game.current_player, self.game.players[0])
+        self.assertEqual(clone.current_player, clone.players[1])
+
+    def test_move_ids(self):
+        moves = self.game.get_valid_moves()
+        self.assertEqual([decode_move(move) for move in self.game.get_valid_move_ids()], moves)
+        for coordinates, direction in moves:
+            self.assertEqual(decode_move(encode_move(coordinates, direction)), (coordinates, direction))
+        self.assertTrue(self.game.make_move_id(encode_move((0, 0), Direction.RIGHT)))
+
+    def test_counts_follow_moves(self):
+        rng = random.Random(7)
+        while not self.game.winner:
+            self.game.make_move(*rng.choice(self.game.get_valid_moves()))
+            counts = dict(self.game.board.counts)
+            self.game.board.update_counts()
+            self.assertEqual(counts, self.game.board.counts)
+            if not self.game.winner:
+                self.assertTrue(self.game.has_valid_move())
+        self.assertEqual(sum(self.game.get_game_state().values()), len(self.game.board.get_all_marbles()))
+
+    def test_capture_moves(self):
+        rng = random.Random(11)
+        while not self.game.winner:
+            expected = []
+            for move in self.game.get_valid_move_ids():
+                game = self.game.clone()
+                game.make_move_id(move)
+                if sum(game.get_game_state().values()) < sum(self.game.get_game_state().values()):
+                    expected.append(move)
+            self.assertEqual(sorted(self.game.get_capture_move_ids()), expected)
+            self.game.make_move(*rng.choice(self.game.get_valid_moves()))
+
+    def test_set_marble_updates_counts(self):
+        self.game.board.set_marble((0, 0), None)
+        self.game.board.set_marble((3, 0), Marble(MarbleColor.BLACK))
+        self.assertEqual(self.game.get_game_state(), {'W': 7, 'B': 9, 'R': 13})
+
+    def test_direct_grid_writes_need_a_recount(self):
+        self.game.board.grid[0][0] = None
+        self.assertEqual(self.game.get_game_state(), {'W': 8, 'B': 8, 'R': 13})
+        self.game.board.update_counts()
+        self.assertEqual(self.game.get_game_state(), {'W': 7, 'B': 8, 'R': 13})
+
+    def test_start_notation(self):
+        self.assertEqual(self.game.to_notation(), START_NOTATION)
+        game = KubaGame.from_notation(START_NOTATION)
+        self.assertEqual(game.get_game_state(), {'W': 8, 'B': 8, 'R': 13})
+        self.assertEqual(game.pack(), self.game.pack())
+
+    def test_notation_round_trip(self):
+        self.game.make_move((0, 0), Direction.RIGHT)
+        self.game.make_move((0, 6), Direction.DOWN)
+        notation = self.game.to_notation()
+        self.assertEqual(notation, "1WW2B1/WW1R1BB/2RRR1B/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 0 0 06D2 2")
+        game = KubaGame.from_notation(notation)
+        self.assertEqual(game.to_notation(), notation)
+        self.assertEqual(game.current_player, game.players[0])
+        self.assertEqual(KubaGame.from_packed(game.pack()).pack(), game.pack())
+
+    def test_notation_keeps_ko_state(self):
+        self.game.make_move((0, 0), Direction.RIGHT)
+        self.game.make_move((0, 6), Direction.LEFT)
+        self.game.make_move((0, 1), Direction.RIGHT)
+        for game in (KubaGame.from_notation(self.game.to_notation()), KubaGame.from_packed(self.game.pack())):
+            self.assertFalse(game.make_move((0, 5), Direction.LEFT))
+            self.assertEqual(game.alert.message, "This move violates the KO rule!")
+
+    def test_pack_includes_ko_state(self):
+        self.game.make_move((0, 0), Direction.RIGHT)
+        self.game.make_move((0, 6), Direction.LEFT)
+        self.game.make_move((0, 1), Direction.RIGHT)
+        notation = self.game.to_notation()
+        without_ko = KubaGame.from_notation(notation.replace(" 01R2 ", " - "))
+        self.assertNotEqual(without_ko.pack(), self.game.pack())
+        self.assertTrue(without_ko.make_move((0, 5), Direction.LEFT))
+
+    def test_notation_detects_finished_game(self):
+        game = KubaGame.from_notation("WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 7 0 - 40")
+        self.assertEqual(game.winner, game.players[0])
+        self.assertEqual(game.moves, 40)
+
+    def test_invalid_notation(self):
+        for notation in ("", "WW3BB W 0 0 -", "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WX W 0 0 -",
+                         "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB4WW W 0 0 -",
+                         "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW R 0 0 -",
+                         "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 0 0 06X2",
+                         "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 0 0 06R2",
+                         "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 8 0 -",
+                         "WW3BB/WW1R1BB/2RRR2/1RRRRR1/2RRR2/BB1R1WW/BB3WW W 0 -1 -"):
+            with self.assertRaises(ValueError):
+                KubaGame.from_notation(notation)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
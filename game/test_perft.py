@@ -0,0 +1,30 @@
+import unittest
+from game.kuba_game import Direction
+from game.perft import EXPECTED, FIXTURES, check_engine, divide, fixture, perft
+
+class TestPerft(unittest.TestCase):
+
+    def test_depth_zero_counts_the_position(self):
+        self.assertEqual(perft(fixture("start"), 0), 1)
+
+    def test_reference_counts(self):
+        for name in FIXTURES:
+            for depth in range(1, 4):
+                with self.subTest(fixture=name, depth=depth):
+                    self.assertEqual(perft(fixture(name), depth), EXPECTED[name][depth - 1])
+
+    def test_divide_sums_to_perft(self):
+        game = fixture("capture")
+        self.assertEqual(sum(divide(game, 2).values()), perft(game, 2))
+
+    def test_ko_fixture_forbids_undo(self):
+        game = fixture("ko")
+        self.assertNotIn(((0, 5), Direction.LEFT), game.get_valid_moves())
+
+    def test_check_engine_reports_mismatches(self):
+        self.assertEqual(check_engine(lambda name, depth: perft(fixture(name), depth), 2), {})
+        mismatches = check_engine(lambda name, depth: 0, 1, ["start"])
+        self.assertEqual(mismatches, {"start": (8, 0)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,23 @@
+import sys
 import pygame
 import asyncio
-from ai.kuba_ai import train_or_load_ai, AI_MODEL_FILE
 from game.kuba_game import KubaGame
 from ui.start_screen import StartScreen
 from ui.game_ui import GameUI
 
 WIDTH, HEIGHT = 1600, 900
+# search the player's likely moves while they think, so the bot can answer right away
+PONDER = True
+
+async def load_ai():
+    # let the start screen draw its first frame before the AI module and model are loaded
+    await asyncio.sleep(0)
+    from ai.kuba_ai import train_or_load_ai, AI_MODEL_FILE
+
+    if sys.platform == "emscripten":
+        # no threads under WebAssembly, load between two start screen frames instead
+        return train_or_load_ai(AI_MODEL_FILE, 1)
+    return await asyncio.to_thread(train_or_load_ai, AI_MODEL_FILE, 1)
 
 async def main_loop():
     pygame.init()
@@ -13,10 +25,7 @@ async def main_loop():
     WIN = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Kuba")
 
-    print("Training AI... This may take a while.")
-    trained_ai = train_or_load_ai(AI_MODEL_FILE, 1)
-    print("AI training complete!")
-
+    ai_task = asyncio.create_task(load_ai())
 
     start_screen = StartScreen(WIN)
     game_started = False
@@ -31,6 +40,8 @@ async def main_loop():
     FPS = 60
     game = KubaGame()
     game_ui = GameUI(WIN, game)
+    trained_ai = None
+    bot = None
     run = True
 
     while run:
@@ -43,12 +54,23 @@ async def main_loop():
                 board_pos = game_ui.get_board_position(pos)
                 if board_pos:
                     game.select(board_pos)
-        
-        if game.current_player.name == "Bot" and not game.winner:
-            action = trained_ai.get_action(game)
+
+        if trained_ai is None and ai_task.done():
+            trained_ai = ai_task.result()
+            if PONDER:
+                from ai.ponder import Ponderer
+                bot = Ponderer(trained_ai)
+            else:
+                bot = trained_ai
+
+        # the bot waits for the model if the player was quicker than the loader
+        if bot and game.current_player.name == "Bot" and not game.winner:
+            action = bot.get_action(game)
             coordinates, direction = action
             game.make_move(coordinates, direction)
             # await asyncio.sleep(0.5)
+        elif PONDER and bot and not game.winner:
+            bot.step(game)
 
         game_ui.draw()
         await asyncio.sleep(0)
@@ -57,4 +79,4 @@ async def main_loop():
     pygame.quit()
 
 if __name__ == "__main__":
-    asyncio.run(main_loop())
\ No newline at end of file
+    asyncio.run(main_loop())
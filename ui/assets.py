@@ -0,0 +1,17 @@
+import os
+import pygame
+
+FONT_PATH = os.path.join('assets', 'fonts', 'PressStart2P-Regular.ttf')
+
+_fonts = {}
+
+def get_font(size):
+    # fonts are loaded once and shared by every screen
+    font = _fonts.get(size)
+    if font is None:
+        font = _fonts[size] = pygame.font.Font(FONT_PATH, size)
+    return font
+
+def unload():
+    # fonts die with pygame.font.quit(), call this before re-initializing pygame
+    _fonts.clear()
@@ -1,5 +1,6 @@
+import time
 import pygame
-import os
+from ui.assets import get_font
 from ui.colors import BLUE, GREEN, RED, WHITE, BLACK, GREY_1, GREY_2, BACKGROUND
 from game.kuba_game import KubaGame
 
@@ -10,26 +11,36 @@ class GameUI:
         self.board_size = min(screen.get_width(), screen.get_height()) * 0.8
         self.square_size = self.board_size // 7
         self.board_offset = ((screen.get_width() - self.board_size) // 2, (screen.get_height() - self.board_size) // 2)
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
 
-        # Load the pixel font
-        font_path = os.path.join('assets', 'fonts', 'PressStart2P-Regular.ttf')
-        self.font = pygame.font.Font(font_path, 24)
-        self.small_font = pygame.font.Font(font_path, 16)
-        self.large_font = pygame.font.Font(font_path, 48)
+        # pixel font shared with the start screen
+        self.font = get_font(24)
+        self.small_font = get_font(16)
+        self.large_font = get_font(48)
 
     def draw(self):
-        self.screen.fill(BACKGROUND)
-        self.draw_board()
-        self.draw_marbles()
-        self.draw_valid_moves()
-        self.draw_player_info('You', 50)
-        self.draw_player_info('Bot', self.screen.get_width() - 300)
-        self.draw_winner()
+        self.render()
         pygame.display.flip()
 
+    def render(self, timings=None):
+        # draws a frame without flipping the display, timings (if given) collects seconds per stage
+        stages = (
+            ("board", self.draw_board),
+            ("marbles", self.draw_marbles),
+            ("valid_moves", self.draw_valid_moves),
+            ("player_info", self.draw_players),
+            ("winner", self.draw_winner),
+        )
+        if timings is None:
+            for _, stage in stages:
+                stage()
+            return
+        for name, stage in stages:
+            start = time.perf_counter()
+            stage()
+            timings[name] = time.perf_counter() - start
+
     def draw_board(self):
+        self.screen.fill(BACKGROUND)
         board_surface = pygame.Surface((self.board_size, self.board_size))
         board_surface.fill(GREY_1)
         for row in range(7):
@@ -84,6 +95,10 @@ class GameUI:
             y = self.board_offset[1] + row * self.square_size + self.square_size // 2
             pygame.draw.circle(self.screen, GREEN, (x, y), 15)
 
+    def draw_players(self):
+        self.draw_player_info('You', 50)
+        self.draw_player_info('Bot', self.screen.get_width() - 300)
+
     def draw_player_info(self, player_name, x):
         player = None
         if self.game.players[0].name == player_name:
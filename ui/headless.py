@@ -0,0 +1,128 @@
+import argparse
+import json
+import os
+import random
+import statistics
+
+# without a display SDL's dummy driver still lets fonts and surfaces work
+if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+from game.kuba_game import KubaGame
+from ui import assets
+from ui.game_ui import GameUI
+
+WIDTH, HEIGHT = 1600, 900
+STAGES = ("board", "marbles", "valid_moves", "player_info", "winner")
+
+
+class HeadlessRenderer:
+    def __init__(self, size=(WIDTH, HEIGHT)):
+        pygame.init()
+        pygame.font.init()
+        # GameUI only needs a surface to draw on, an offscreen one keeps the window out of it
+        self.surface = pygame.Surface(size)
+        self.ui = GameUI(self.surface, KubaGame())
+
+    def render(self, game):
+        timings = {}
+        self.ui.game = game
+        self.ui.render(timings)
+        return timings
+
+    def snapshot(self, path):
+        pygame.image.save(self.surface, path)
+
+    def close(self):
+        assets.unload()
+        pygame.quit()
+
+
+def scripted_game(seed=0, max_frames=200):
+    # a seeded random game, every state is shown with the next moved marble selected
+    rng = random.Random(seed)
+    game = KubaGame()
+    frames = 0
+    while frames < max_frames:
+        moves = [] if game.winner else game.get_valid_moves()
+        game.selected = rng.choice(moves)[0] if moves else None
+        yield game
+        frames += 1
+        if not moves:
+            return
+        game = game.clone()
+        coordinates = game.selected
+        game.selected = None
+        game.make_move(coordinates, rng.choice([d for c, d in moves if c == coordinates]))
+
+
+def run(games, snapshot_dir=None, renderer=None):
+    own_renderer = renderer is None
+    renderer = renderer or HeadlessRenderer()
+    frames = []
+    try:
+        for i, game in enumerate(games):
+            timings = renderer.render(game)
+            timings["total"] = sum(timings.values())
+            frames.append(timings)
+            if snapshot_dir:
+                renderer.snapshot(os.path.join(snapshot_dir, f"frame_{i:04d}.png"))
+    finally:
+        if own_renderer:
+            renderer.close()
+    return frames
+
+
+def summarize(frames):
+    summary = {}
+    for stage in STAGES + ("total",):
+        values = sorted(1000 * frame[stage] for frame in frames)
+        summary[stage] = {
+            "mean_ms": statistics.fmean(values),
+            "p95_ms": values[min(len(values) - 1, int(0.95 * len(values)))],
+            "max_ms": values[-1],
+        }
+    return summary
+
+
+def diff_pixels(path_a, path_b):
+    # number of pixels that differ between two snapshots
+    a = pygame.image.load(path_a)
+    b = pygame.image.load(path_b)
+    if a.get_size() != b.get_size():
+        return a.get_width() * a.get_height()
+    diff = a.copy()
+    diff.blit(b, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+    reverse = b.copy()
+    reverse.blit(a, (0, 0), special_flags=pygame.BLEND_RGB_SUB)
+    diff.blit(reverse, (0, 0), special_flags=pygame.BLEND_RGB_ADD)
+    same = pygame.mask.from_threshold(diff, (0, 0, 0), (1, 1, 1, 255)).count()
+    return diff.get_width() * diff.get_height() - same
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a scripted game without a window and time every draw stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--positions", help="file with one position notation per line instead of a random game")
+    parser.add_argument("--snapshots", help="directory to save a PNG of every frame to")
+    parser.add_argument("--output", help="write per-frame timings and the summary as JSON to this file")
+    args = parser.parse_args()
+
+    if args.positions:
+        with open(args.positions) as f:
+            games = [KubaGame.from_notation(line) for line in f if line.strip()]
+    else:
+        games = scripted_game(args.seed, args.frames)
+    if args.snapshots:
+        os.makedirs(args.snapshots, exist_ok=True)
+
+    frames = run(games, args.snapshots)
+    summary = summarize(frames)
+    for stage, values in summary.items():
+        print(f"{stage:<12} mean {values['mean_ms']:7.3f} ms  p95 {values['p95_ms']:7.3f} ms  max {values['max_ms']:7.3f} ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"frames": frames, "summary": summary}, f, indent=2)
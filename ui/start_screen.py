@@ -1,13 +1,12 @@
 import pygame
-import os
+from ui.assets import get_font
 
 class StartScreen:
     def __init__(self, screen):
         self.screen = screen
-        font_path = os.path.join('assets', 'fonts', 'PressStart2P-Regular.ttf')
-        self.font = pygame.font.Font(font_path, 24)
-        self.small_font = pygame.font.Font(font_path, 16)
-        self.large_font = pygame.font.Font(font_path, 48)
+        self.font = get_font(24)
+        self.small_font = get_font(16)
+        self.large_font = get_font(48)
 
     def draw(self):
         self.screen.fill((200, 200, 200))
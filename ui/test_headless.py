@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+from game.kuba_game import KubaGame, Direction
+
+@unittest.skipIf(pygame is None, "pygame is not installed")
+class TestHeadless(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from ui import headless
+        cls.headless = headless
+        cls.renderer = headless.HeadlessRenderer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.renderer.close()
+
+    def test_render_times_every_stage(self):
+        timings = self.renderer.render(KubaGame())
+        self.assertEqual(set(timings), set(self.headless.STAGES))
+
+    def test_scripted_game_is_reproducible(self):
+        first = [game.to_notation() for game in self.headless.scripted_game(3, 20)]
+        second = [game.to_notation() for game in self.headless.scripted_game(3, 20)]
+        self.assertEqual(first, second)
+        self.assertEqual(len(first), 20)
+
+    def test_snapshots_compare_pixels(self):
+        game = KubaGame()
+        moved = game.clone()
+        self.assertTrue(moved.make_move((0, 0), Direction.RIGHT))
+        with tempfile.TemporaryDirectory() as directory:
+            frames = self.headless.run([game, game, moved], directory, self.renderer)
+            self.assertEqual(len(frames), 3)
+            paths = [os.path.join(directory, f"frame_{i:04d}.png") for i in range(3)]
+            self.assertEqual(self.headless.diff_pixels(paths[0], paths[1]), 0)
+            self.assertGreater(self.headless.diff_pixels(paths[0], paths[2]), 0)
+        summary = self.headless.summarize(frames)
+        self.assertIn("total", summary)
+
+if __name__ == '__main__':
+    unittest.main()